@@ -1,63 +1,168 @@
 import os
 import re
-from docx import Document
+import unicodedata
+import zipfile
+from xml.etree import ElementTree
 import pandas as pd
-from openpyxl import load_workbook
+from copy import copy
+from openpyxl import load_workbook, Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font
+from trigram_index import build_trigram_index, query_trigram_candidates, trigram_similarity
+
+# Word 文档中段落、文本、制表符和换行的标签
+WORD_NAMESPACE = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+WORD_PARAGRAPH = WORD_NAMESPACE + 'p'
+WORD_TEXT = WORD_NAMESPACE + 't'
+WORD_TAB = WORD_NAMESPACE + 'tab'
+WORD_BREAK = WORD_NAMESPACE + 'br'
+
+# GB/T 7714 期刊文献著录格式：作者. 题名[J]. 刊名, 年, 卷(期): 起止页码或文献号码.
+GBT7714_PATTERN = re.compile(
+    r'^(?P<authors>[^.]+?)\.\s*'
+    r'(?P<title>.+?)\s*\[(?P<type>[A-Z]{1,2}(?:/[A-Z]{2})?)\]\.\s*'
+    r'(?P<journal>[^,，\[\]]+?)\s*[,，]\s*'
+    r'(?P<year_issue_page>(?P<year>\d{4})[a-z]?'
+    r'(?:\s*[,，]\s*(?P<volume>[^(（:：,，]+?))?'
+    r'(?:\s*[(（](?P<issue>[^)）]+)[)）])?'
+    r'(?:\s*[:：]\s*(?P<pages>[^.]+?))?)'
+    r'\s*\.?\s*$'
+)
+# 没有文献类型标识时题名和刊名的分界不明确：题名可以含有 '. '，刊名不能含有 '. '（以最后一个 '. ' 为分界）
+GBT7714_UNMARKED_PATTERN = re.compile(
+    r'^(?P<authors>[^.]+?)\.\s*'
+    r'(?P<title>.+)\.\s+'
+    r'(?P<journal>(?:(?!\.\s)[^,，\[\]])+?)\s*[,，]\s*'
+    r'(?P<year_issue_page>(?P<year>\d{4})[a-z]?'
+    r'(?:\s*[,，]\s*(?P<volume>[^(（:：,，]+?))?'
+    r'(?:\s*[(（](?P<issue>[^)）]+)[)）])?'
+    r'(?:\s*[:：]\s*(?P<pages>[^.]+?))?)'
+    r'\s*\.?\s*$'
+)
+PAGE_RANGE_PATTERN = re.compile(r'(\S+?)\s*[-—–~]\s*(\S+)')
+
+
+def iter_docx_paragraphs(docx_path):
+    """
+    直接从 word/document.xml 流式读取段落文本，逐段返回，不加载整个文档对象。
+    """
+    with zipfile.ZipFile(docx_path) as docx_zip, docx_zip.open('word/document.xml') as document_xml:
+        texts = []
+        for event, element in ElementTree.iterparse(document_xml, events=('start', 'end')):
+            if event == 'start':
+                if element.tag == WORD_PARAGRAPH:
+                    texts = []
+                continue
+
+            if element.tag == WORD_TEXT:
+                texts.append(element.text or '')
+            elif element.tag == WORD_TAB:
+                texts.append('\t')
+            elif element.tag == WORD_BREAK:
+                texts.append('\n')
+            elif element.tag == WORD_PARAGRAPH:
+                yield ''.join(texts)
+                element.clear()
+
+
+def parse_page_info(page_info):
+    """
+    将页码信息拆分为开始页、结束页或文献号码；只有一个纯数字页码时作为开始页。
+    """
+    start_page, end_page, article_number = None, None, None
+    if not page_info:
+        return start_page, end_page, article_number
+
+    page_match = PAGE_RANGE_PATTERN.fullmatch(page_info.strip())
+    if page_match:
+        start_page, end_page = page_match.groups()
+    elif page_info.strip().isdigit():
+        start_page = page_info.strip()
+    else:
+        article_number = page_info.strip()
+    return start_page, end_page, article_number
+
+
+def parse_reference_text(text):
+    """
+    按 GB/T 7714 格式解析一条文献，返回作者、题名、刊名、年、卷、期、页码等字段；
+    不符合该格式时退回按 '.' 切分的解析方式，仍无法解析时返回 None。
+    """
+    match = GBT7714_PATTERN.match(text) or GBT7714_UNMARKED_PATTERN.match(text)
+    if match:
+        start_page, end_page, article_number = parse_page_info(match.group('pages'))
+        return {
+            '作者': match.group('authors').strip(),
+            '题名': match.group('title').strip(),
+            '刊名': match.group('journal').strip(),
+            '年': match.group('year'),
+            '年卷期页码': match.group('year_issue_page').strip(),
+            '卷': (match.group('volume') or '').strip() or None,
+            '期': (match.group('issue') or '').strip() or None,
+            '开始页': start_page,
+            '结束页': end_page,
+            '文献号码': article_number
+        }
+
+    parts = [p.strip() for p in text.split('.') if p.strip()]
+
+    if len(parts) < 4:
+        return None
+
+    author, title, journal, year_issue_page = parts[0:4]
+
+    if ',' in year_issue_page:
+        year = year_issue_page.split(',')[0].strip()
+    else:
+        year = ""
+
+    page_info = parts[-1]
+    start_page, end_page, article_number = None, None, None
+
+    page_match = re.search(r'(\d+)[-—](\d+)', page_info)
+    if page_match:
+        start_page, end_page = page_match.groups()
+    else:
+        if ':' in page_info:
+            potential_info = page_info.split(':')[-1].strip()
+            if not re.search(r'[-—]', potential_info):
+                article_number = potential_info
+
+    return {
+        '作者': author,
+        '题名': title,
+        '刊名': journal,
+        '年': year,
+        '年卷期页码': year_issue_page,
+        '卷': None,
+        '期': None,
+        '开始页': start_page,
+        '结束页': end_page,
+        '文献号码': article_number
+    }
+
 
 def extract_references_from_docx(docx_path):
     """
-    从 Word 文档中提取文献的详细信息，包括作者、题名、刊名、年、卷期页码、开始页和结束页或文献号码。
+    从 Word 文档中提取文献的详细信息，包括作者、题名、刊名、年、卷、期、开始页和结束页或文献号码。
     """
     if not os.path.exists(docx_path):
         raise FileNotFoundError(f"文件不存在: {docx_path}")
 
-    doc = Document(docx_path)
     references = []
 
     paper_index = 1
 
-    for paragraph in doc.paragraphs:
-        text = paragraph.text.strip()
+    for paragraph_text in iter_docx_paragraphs(docx_path):
+        text = paragraph_text.strip()
         if not text:
             continue
 
-        parts = [p.strip() for p in text.split('.') if p.strip()]
-
-        if len(parts) < 4:
+        reference = parse_reference_text(text)
+        if reference is None:
             continue
 
-        author, title, journal, year_issue_page = parts[0:4]
-
-        if ',' in year_issue_page:
-            year = year_issue_page.split(',')[0].strip()
-        else:
-            year = ""
-
-        page_info = parts[-1]
-        start_page, end_page, article_number = None, None, None
-
-        page_match = re.search(r'(\d+)[-—](\d+)', page_info)
-        if page_match:
-            start_page, end_page = page_match.groups()
-        else:
-            if ':' in page_info:
-                potential_info = page_info.split(':')[-1].strip()
-                if not re.search(r'[-—]', potential_info):
-                    article_number = potential_info
-
-        reference = {
-            '论文清单序号': paper_index,
-            '作者': author,
-            '题名': title,
-            '刊名': journal,
-            '年': year,
-            '年卷期页码': year_issue_page,
-            '开始页': start_page,
-            '结束页': end_page,
-            '文献号码': article_number
-        }
-        references.append(reference)
+        references.append({'论文清单序号': paper_index, **reference})
 
         paper_index += 1
 
@@ -77,7 +182,7 @@ def export_references_to_excel(references, output_path):
         worksheet = writer.sheets['张健论文清单']
 
         cell_format = workbook.add_format({'font_name': 'Arial'})
-        worksheet.set_column('A:I', None, cell_format)
+        worksheet.set_column('A:K', None, cell_format)
 
     print(f"文献信息已成功导出至: {output_path}")
 
@@ -91,113 +196,279 @@ def clean_title(title):
     return title.lower().strip()  # 转为小写并去除两端空格
 
 
+# 原始页码/文献号码列与标准化列的对应关系
+SCI_PAGE_COLUMNS = {'Start Page': '标准化开始页', 'End Page': '标准化结束页', 'Article Number': '标准化文献号码'}
+REFERENCE_PAGE_COLUMNS = {'开始页': '标准化开始页', '结束页': '标准化结束页', '文献号码': '标准化文献号码'}
+
+
+def normalize_page_series(series):
+    """
+    按列标准化页码或文献号码：空值转为空字符串，Excel 读回的浮点数（如 123.0）去掉小数部分和前导零，
+    罗马数字页码和 e 开头的电子文献号等其余文本统一去空格并转为小写。
+    """
+    text = series.astype('string').str.strip().str.lower().fillna('')
+    is_number = text.str.fullmatch(r'\d+(?:\.\d*)?')
+    integer_part = text.str.replace(r'\..*$', '', regex=True).str.lstrip('0').replace('', '0')
+    return integer_part.where(is_number, text).astype(object)
+
+
+def normalize_page_columns(df, column_map):
+    """
+    为 DataFrame 添加标准化的页码/文献号码列，原列不存在时填充空字符串。
+    """
+    for source_column, normalized_column in column_map.items():
+        if source_column in df.columns:
+            df[normalized_column] = normalize_page_series(df[source_column])
+        else:
+            df[normalized_column] = ''
+    return df
+
+
+# 希腊字母统一转写为英文名称，使 "α-synuclein" 与 "alpha-synuclein" 可以互相匹配
+GREEK_LETTERS = {
+    'α': 'alpha', 'β': 'beta', 'γ': 'gamma', 'δ': 'delta', 'ε': 'epsilon', 'ζ': 'zeta', 'η': 'eta',
+    'θ': 'theta', 'ι': 'iota', 'κ': 'kappa', 'λ': 'lambda', 'μ': 'mu', 'ν': 'nu', 'ξ': 'xi',
+    'ο': 'omicron', 'π': 'pi', 'ρ': 'rho', 'σ': 'sigma', 'ς': 'sigma', 'τ': 'tau', 'υ': 'upsilon',
+    'φ': 'phi', 'χ': 'chi', 'ψ': 'psi', 'ω': 'omega',
+}
+
+# 模糊标题匹配的最低 Dice 相似度
+FUZZY_TITLE_THRESHOLD = 0.75
+
+
+def fuzzy_title_keys(title):
+    """
+    生成用于模糊匹配的标题键：转写希腊字母、去掉重音符号后清洗，
+    返回 (完整标题, 主标题)，主标题为去掉副标题（冒号或破折号之后部分）的标题，没有副标题时为 ''。
+    """
+    title = unicodedata.normalize('NFKC', str(title)).lower()
+    title = ''.join(GREEK_LETTERS.get(char, char) for char in title)
+    title = ''.join(char for char in unicodedata.normalize('NFKD', title) if not unicodedata.combining(char))
+
+    main_title = re.split(r'\s*[:：]\s*|\s+[-–—]\s+', title, maxsplit=1)[0]
+    return clean_title(title), clean_title(main_title) if main_title != title else ''
+
+
+def pages_conflict(reference_pages, sci_pages):
+    """
+    两侧都有页码（或都有文献号码）且不一致时返回 True，例如同一主标题下 pp. 10-20 与 pp. 300-310 的两篇文献。
+    页码和文献号码均为 (开始页, 结束页, 文献号码) 形式的标准化值，空值为 ''。
+    """
+    reference_start, reference_end, reference_article = reference_pages
+    sci_start, sci_end, sci_article = sci_pages
+    if reference_start and sci_start:
+        return reference_start != sci_start or bool(reference_end and sci_end and reference_end != sci_end)
+    if reference_article and sci_article:
+        return reference_article != sci_article
+    return False
+
+
+def first_five_words(title):
+    """
+    取标题（小写）的前五个单词。
+    """
+    return ' '.join(title.strip().lower().split()[:5])
+
+
+def build_reference_indexes(references_df):
+    """
+    为论文清单一次性建立各级匹配所需的查找索引。
+    标题索引保留最后出现的记录，页码索引保留最先出现的记录（及其位置），与逐行扫描的结果一致。
+    需要先调用 normalize_page_columns 添加标准化页码列；空页码和空文献号码不参与索引。
+    """
+    indexes = {
+        'title': {},
+        'cleaned_title': {},
+        'words_pages': {},
+        'words_article': {},
+        'pages': {},
+        'fuzzy_papers': [],
+        'fuzzy_is_main': [],
+        'fuzzy_full_titles': [],
+        'fuzzy_pages': [],
+    }
+    fuzzy_keys = []
+
+    rows = zip(references_df['论文清单序号'], references_df['题名'], references_df['标准化开始页'],
+               references_df['标准化结束页'], references_df['标准化文献号码'])
+
+    for position, (paper_index, title, start_page, end_page, article_number) in enumerate(rows):
+        indexes['title'][title.strip().lower()] = paper_index
+        indexes['cleaned_title'][clean_title(title)] = paper_index
+
+        words = first_five_words(title)
+        if start_page:
+            indexes['words_pages'].setdefault((words, start_page, end_page), (position, paper_index))
+            indexes['pages'].setdefault((start_page, end_page), (position, paper_index))
+        if article_number:
+            indexes['words_article'].setdefault((words, article_number), (position, paper_index))
+        elif start_page and not end_page:
+            # 只有一个纯数字页码的文献也可能是 SCI-E 中的文献号码
+            indexes['words_article'].setdefault((words, start_page), (position, paper_index))
+
+        # 完整标题和主标题都进入模糊索引，记下是否为主标题、所属文献的完整标题和页码
+        full_title, main_title = fuzzy_title_keys(title)
+        for is_main, key in ((False, full_title), (True, main_title)):
+            if key:
+                fuzzy_keys.append(key)
+                indexes['fuzzy_papers'].append(paper_index)
+                indexes['fuzzy_is_main'].append(is_main)
+                indexes['fuzzy_full_titles'].append(full_title)
+                indexes['fuzzy_pages'].append((start_page, end_page, article_number))
+
+    indexes['fuzzy'] = build_trigram_index(fuzzy_keys)
+
+    return indexes
+
+
+def lookup_reference(indexes, title, start_page, end_page, article_number):
+    """
+    按 精确标题 → 清洗后标题 → 前五个单词+页码/文献号码 → 页码 → 模糊标题 的顺序查找，
+    返回 (论文清单序号, 模糊匹配相似度)，只有模糊匹配才带相似度，未匹配返回 (None, None)。
+    模糊匹配时主标题只与完整标题比较，不与另一侧的主标题比较；两侧页码不一致的候选不采用；
+    返回的相似度为两侧完整标题的相似度，而不是命中的主标题的相似度。
+    """
+    sci_title = title.strip().lower()
+
+    # First, try exact title match
+    if sci_title in indexes['title']:
+        return indexes['title'][sci_title], None
+
+    # Second, try cleaned title match
+    cleaned_sci_title = clean_title(title).strip()
+    if cleaned_sci_title in indexes['cleaned_title']:
+        return indexes['cleaned_title'][cleaned_sci_title], None
+
+    # Third, try title first 5 words match, taking the earliest reference that satisfies either key
+    words = first_five_words(sci_title)
+    candidates = [indexes['words_pages'].get((words, start_page, end_page))]
+    if start_page == '' and article_number:
+        candidates.append(indexes['words_article'].get((words, article_number)))
+    candidates = [c for c in candidates if c is not None]
+    if candidates:
+        return min(candidates)[1], None
+
+    # Fourth, check if start page and end page match
+    if (start_page, end_page) in indexes['pages']:
+        return indexes['pages'][(start_page, end_page)][1], None
+
+    # Fifth, try approximate title match through the trigram index
+    full_title, main_title = fuzzy_title_keys(title)
+    best = None
+    for is_main, key in ((False, full_title), (True, main_title)):
+        if not key:
+            continue
+        for position, score in query_trigram_candidates(indexes['fuzzy'], key, FUZZY_TITLE_THRESHOLD):
+            if is_main and indexes['fuzzy_is_main'][position]:
+                continue
+            if pages_conflict(indexes['fuzzy_pages'][position], (start_page, end_page, article_number)):
+                continue
+            if best is None or score > best[1]:
+                best = (position, score)
+            break
+    if best is not None:
+        full_score = trigram_similarity(full_title, indexes['fuzzy_full_titles'][best[0]])
+        return indexes['fuzzy_papers'][best[0]], round(full_score, 3)
+
+    return None, None
+
+
 def match_references(sci_df, references_df):
     """
-    匹配文献标题或页码，并添加论文清单序号列。
+    匹配文献标题或页码，并添加论文清单序号列；模糊匹配的记录在“模糊匹配相似度”列中给出相似度，供人工复核。
     """
     sci_df.insert(0, '论文清单序号', None)
 
-    # Convert references_df to dictionaries for faster lookup
-    reference_dict = {}
-    cleaned_ref_dict = {}
-
-    for _, row in references_df.iterrows():
-        ref_title = row['题名'].strip().lower()
-        cleaned_ref_title = clean_title(row['题名'])
-        reference_dict[ref_title] = row['论文清单序号']
-        cleaned_ref_dict[cleaned_ref_title] = row['论文清单序号']
-
-    for i, sci_row in sci_df.iterrows():
-        sci_title = sci_row['Article Title'].strip().lower()
-
-        # 将所有相关字段转换为字符串，同时去掉小数点
-        sci_start_page = str(int(float(sci_row.get('Start Page', '')))) if str(sci_row.get('Start Page', '')).replace(
-            '.', '', 1).isdigit() else str(sci_row.get('Start Page', '')).strip()
-        sci_end_page = str(int(float(sci_row.get('End Page', '')))) if str(sci_row.get('End Page', '')).replace('.', '',
-                                                                                                                1).isdigit() else str(
-            sci_row.get('End Page', '')).strip()
-        sci_article_number = str(int(float(sci_row.get('Article Number', '')))) if str(
-            sci_row.get('Article Number', '')).replace('.', '', 1).isdigit() else str(
-            sci_row.get('Article Number', '')).strip()
-
-        matched = False
-
-        # First, try exact title match
-        if sci_title in reference_dict:
-            sci_df.at[i, '论文清单序号'] = reference_dict[sci_title]
-            continue
+    # 匹配前按列一次性标准化两侧的页码和文献号码
+    normalize_page_columns(sci_df, SCI_PAGE_COLUMNS)
+    normalize_page_columns(references_df, REFERENCE_PAGE_COLUMNS)
 
-        # Second, try cleaned title match
-        cleaned_sci_title = clean_title(sci_row['Article Title']).strip()
-        if cleaned_sci_title in cleaned_ref_dict:
-            sci_df.at[i, '论文清单序号'] = cleaned_ref_dict[cleaned_sci_title]
-            continue
+    indexes = build_reference_indexes(references_df)
+
+    rows = zip(sci_df['Article Title'], sci_df['标准化开始页'], sci_df['标准化结束页'], sci_df['标准化文献号码'])
+    matches = [lookup_reference(indexes, title, start_page, end_page, article_number)
+               for title, start_page, end_page, article_number in rows]
+    sci_df['论文清单序号'] = pd.Series([m[0] for m in matches], index=sci_df.index, dtype=object)
+    sci_df['模糊匹配相似度'] = pd.Series([m[1] for m in matches], index=sci_df.index, dtype=object)
 
-        # Third, try title first 5 words match
-        sci_title_first_five_words = ' '.join(sci_title.split()[:5])
-        for _, ref_row in references_df.iterrows():
-            ref_title_first_five_words = ' '.join(ref_row['题名'].strip().lower().split()[:5])
-
-            # 将参考文献中的开始页和结束页转换为字符串，同时去掉小数点
-            ref_start_page = str(int(float(ref_row['开始页']))) if str(ref_row['开始页']).replace('.', '',
-                                                                                                  1).isdigit() else str(
-                ref_row['开始页']).strip()
-            ref_end_page = str(int(float(ref_row['结束页']))) if str(ref_row['结束页']).replace('.', '',
-                                                                                                1).isdigit() else str(
-                ref_row['结束页']).strip()
-            ref_article_number = str(int(float(ref_row['文献号码']))) if str(ref_row['文献号码']).replace('.', '',
-                                                                                                          1).isdigit() else str(
-                ref_row['文献号码']).strip()
-
-            if sci_title_first_five_words == ref_title_first_five_words:
-                if ((sci_start_page == ref_start_page and sci_end_page == ref_end_page) or
-                        (sci_start_page == '' and sci_article_number == ref_article_number)):
-                    sci_df.at[i, '论文清单序号'] = ref_row['论文清单序号']
-                    matched = True
-                    break
-
-        # Fourth, check if start page and end page match
-        if not matched:
-            for _, ref_row in references_df.iterrows():
-                ref_start_page = str(int(float(ref_row['开始页']))) if str(ref_row['开始页']).replace('.', '',
-                                                                                                      1).isdigit() else str(
-                    ref_row['开始页']).strip()
-                ref_end_page = str(int(float(ref_row['结束页']))) if str(ref_row['结束页']).replace('.', '',
-                                                                                                    1).isdigit() else str(
-                    ref_row['结束页']).strip()
-                if (sci_start_page == ref_start_page and sci_end_page == ref_end_page):
-                    sci_df.at[i, '论文清单序号'] = ref_row['论文清单序号']
-                    matched = True
-                    break
-
-        # If no match, set to None
-        if not matched:
-            sci_df.at[i, '论文清单序号'] = None
+    for i, (paper_index, score) in enumerate(matches):
+        if score is not None:
+            print(f"模糊匹配（请复核）: 第 {i + 2} 行 -> 论文清单序号 {paper_index}，相似度 {score}")
 
     return sci_df
 
 
-def preserve_formatting_and_export(sci_df, sci_file_path, output_sci_path):
+def preserve_formatting_and_export(sci_df, sci_file_path, output_sci_path, streaming=False):
     """
     将带有匹配结果的文献信息导出为 Excel 格式，保留原有的格式，包括单元格内部分文本格式。
+    最前面加上论文清单序号和模糊匹配相似度两列，后者只有模糊匹配的记录有值，供人工复核。
+    streaming=True 时逐行流式复制，适用于行数很多的 SCI-E 导出文件。
     """
+    if streaming:
+        stream_formatting_and_export(sci_df, sci_file_path, output_sci_path)
+        return
+
     workbook = load_workbook(sci_file_path)
     sheet = workbook.active
 
-    sheet.insert_cols(1)
+    sheet.insert_cols(1, 2)
     sheet.cell(row=1, column=1).value = '论文清单序号'
+    sheet.cell(row=1, column=2).value = '模糊匹配相似度'
 
     arial_font = Font(name='Arial')
 
-    for idx, value in enumerate(sci_df['论文清单序号'], start=2):
-        cell = sheet.cell(row=idx, column=1)
-        cell.value = value
-        cell.font = arial_font
+    for idx, values in enumerate(zip(sci_df['论文清单序号'], sci_df['模糊匹配相似度']), start=2):
+        for column, value in enumerate(values, start=1):
+            cell = sheet.cell(row=idx, column=column)
+            cell.value = value
+            cell.font = arial_font
 
     workbook.save(output_sci_path)
     print(f"更新后的 SCI-E 文件已成功导出至: {output_sci_path}")
 
 
+def stream_formatting_and_export(sci_df, sci_file_path, output_sci_path):
+    """
+    以只读模式逐行读取 SCI-E 文件，写入新工作簿时在最前面加上论文清单序号和模糊匹配相似度两列，
+    并逐个单元格复制字体、填充、边框、对齐、数字格式和单元格内部分文本格式。
+    不保留列宽和合并单元格（只读模式无法读取）。
+    """
+    source_workbook = load_workbook(sci_file_path, read_only=True, rich_text=True)
+    source_sheet = source_workbook.active
+
+    output_workbook = Workbook(write_only=True)
+    output_sheet = output_workbook.create_sheet(source_sheet.title)
+
+    arial_font = Font(name='Arial')
+    match_values = zip(sci_df['论文清单序号'], sci_df['模糊匹配相似度'])
+
+    for row_idx, row in enumerate(source_sheet.iter_rows(), start=1):
+        values = ('论文清单序号', '模糊匹配相似度') if row_idx == 1 else next(match_values, (None, None))
+        output_row = []
+        for value in values:
+            match_cell = WriteOnlyCell(output_sheet, value=value)
+            if row_idx > 1:
+                match_cell.font = arial_font
+            output_row.append(match_cell)
+
+        for cell in row:
+            new_cell = WriteOnlyCell(output_sheet, value=cell.value)
+            if getattr(cell, 'has_style', False):
+                new_cell.font = copy(cell.font)
+                new_cell.border = copy(cell.border)
+                new_cell.fill = copy(cell.fill)
+                new_cell.number_format = cell.number_format
+                new_cell.protection = copy(cell.protection)
+                new_cell.alignment = copy(cell.alignment)
+            output_row.append(new_cell)
+
+        output_sheet.append(output_row)
+
+    output_workbook.save(output_sci_path)
+    source_workbook.close()
+    print(f"更新后的 SCI-E 文件已成功导出至: {output_sci_path}")
+
+
 def main():
     docx_path = r'examples\张健示例\张健论文清单.docx'
     output_references_path = r'examples\张健示例\委托人论文清单.xlsx'
@@ -212,7 +483,7 @@ def main():
 
     updated_sci_df = match_references(sci_df, references_df)
 
-    preserve_formatting_and_export(updated_sci_df, sci_file_path, output_sci_path)
+    preserve_formatting_and_export(updated_sci_df, sci_file_path, output_sci_path, streaming=True)
 
 
 if __name__ == "__main__":
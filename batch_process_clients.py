@@ -0,0 +1,285 @@
+import os
+import glob
+import hashlib
+import time
+import argparse
+import traceback
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pypinyin import lazy_pinyin, Style
+
+import add_number_and_bold_red_same_author_to_references as references_step
+import journal_report
+import jif_index
+import highlight_each_papers_authors
+import combine_citation_papers
+import merge_all_and_sum_all
+from stage_cache import load_cache, run_cached
+
+
+def find_clients(patterns):
+    """
+    将委托人文件夹路径或通配符展开为去重、排序后的文件夹列表。
+    """
+    client_dirs = set()
+    for pattern in patterns:
+        for path in glob.glob(pattern):
+            if os.path.isdir(path):
+                client_dirs.add(os.path.abspath(path))
+    return sorted(client_dirs)
+
+
+def find_paper_list(client_dir):
+    """
+    查找委托人文件夹中的论文清单 .docx 文件（如 张健论文清单.docx）。
+    """
+    candidates = sorted(glob.glob(os.path.join(client_dir, '*论文清单.docx')))
+    if not candidates:
+        raise FileNotFoundError(f"未找到论文清单 .docx 文件: {client_dir}")
+    return candidates[0]
+
+
+def author_pinyin_from_paper_list(docx_path):
+    """
+    由论文清单文件名中的中文姓名生成 '姓, 名' 形式的拼音，例如 张健论文清单.docx -> 'Zhang, Jian'。
+    """
+    chinese_name = os.path.basename(docx_path).replace('论文清单.docx', '')
+    pinyin_name = lazy_pinyin(chinese_name, style=Style.NORMAL, strict=False)
+    if len(pinyin_name) < 2:
+        raise ValueError(f"无法从文件名中识别委托人姓名: {docx_path}")
+    return f"{pinyin_name[0].capitalize()}, {''.join(pinyin_name[1:]).capitalize()}"
+
+
+def build_client_stages(client_dir, output_folder, multiple_categories=False, cache=None,
+                        dump_intermediate=False, history_path=None, trend_years=None, file_workers=None,
+                        index_dir=None):
+    """
+    返回一个委托人完整处理链的各个阶段 [(阶段名称, 函数), ...]，按顺序调用即可完成处理：
+    论文清单标序号与标红、期刊影响因子统计、自引高亮、引用格式表与引用统计（内存流水线）和汇总。
+    所有输出写入该委托人独立的输出文件夹。传入阶段缓存时，输入内容和参数都未变化的阶段会被跳过；
+    dump_intermediate=True 时额外写出 citation_output.xlsx 和 citation_for_word.xlsx 以便调试；
+    history_path 和 trend_years 传给期刊影响因子统计，用于添加历年影响因子列和按出版年份匹配影响因子；
+    file_workers 大于 1 时自引高亮阶段用进程池并行处理各 savedrecs 文件；
+    index_dir 为期刊影响因子索引所在目录，未指定时使用 jif_index 的默认共享目录。
+    """
+    client_dir = os.path.abspath(client_dir)
+    output_folder = os.path.abspath(output_folder)
+
+    scie_folder = os.path.join(client_dir, 'SCI-E收录数据')
+    citation_folder = os.path.join(client_dir, 'SCI-E引用数据')
+    docx_path = find_paper_list(client_dir)
+    author_name = author_pinyin_from_paper_list(docx_path)
+    sci_file_path = os.path.join(scie_folder, 'SCI-E收录.xlsx')
+    jif_path = os.path.join(scie_folder, '期刊影响因子.xlsx')
+    txt_file_path = os.path.join(citation_folder, 'SCI-E引用格式.txt')
+    numbered_sci_path = os.path.join(output_folder, 'SCI-E收录已标序号.xlsx')
+    references_path = os.path.join(output_folder, '委托人论文清单.xlsx')
+    highlighted_sci_path = os.path.join(output_folder, '1_SCI-E收录已标序号已标红.xlsx')
+    journal_report_path = os.path.join(output_folder, '2_SCI-E收录统计及影响因子与分区表_for_word.xlsx')
+    combined_paths = [os.path.join(output_folder, name) for name in
+                      ['3_SCI-E引用明细表.xlsx', '4_SCI-E引用统计表.xlsx', '5_SCI-E引用格式表_for_word.xlsx']]
+    merged_paths = [os.path.join(output_folder, name) for name in
+                    ['3_SCI-E引用明细表_已汇总.xlsx', '4_SCI-E引用统计表_已汇总.xlsx',
+                     '5_SCI-E引用格式表_for_word_已汇总.xlsx']]
+
+    def number_references():
+        references = references_step.extract_references_from_docx(docx_path)
+        references_step.export_references_to_excel(references, references_path)
+
+        sci_df = pd.read_excel(sci_file_path)
+        references_df = pd.read_excel(references_path)
+        updated_sci_df = references_step.match_references(sci_df, references_df)
+        references_step.preserve_formatting_and_export(updated_sci_df, sci_file_path, numbered_sci_path,
+                                                       streaming=True)
+
+    def highlight_client_name():
+        references_step.highlight_names_in_excel(numbered_sci_path, highlighted_sci_path, author_name)
+
+    def count_journals():
+        journal_report.process_journal_data(sci_file_path, jif_path, journal_report_path, multiple_categories,
+                                            index_path=jif_index.default_index_path(jif_path, index_dir),
+                                            history_path=history_path, trend_years=trend_years,
+                                            category_report=multiple_categories)
+
+    def highlight_self_citations():
+        papers_file = os.path.join(client_dir, 'papers.xlsx')
+        if not os.path.exists(papers_file):
+            papers_file = numbered_sci_path
+        # 按 savedrecs 文件分别缓存，只重新处理有变化的文件
+        highlight_each_papers_authors.highlight_each_papers(citation_folder, output_folder, papers_file, cache,
+                                                            file_workers)
+
+    def combine_papers():
+        combine_citation_papers.combine_citation_papers_from_txt(txt_file_path, output_folder, dump_intermediate)
+
+    def merge_outputs():
+        # 只合并 files_to_merge 列出的文件，与缓存键使用的输入一致，不会把上次的汇总表再合并进来
+        def merge_inputs(prefix):
+            return [path for path in files_to_merge() if os.path.basename(path).startswith(prefix)]
+
+        merge_all_and_sum_all.merge_excel_files_with_format(output_folder, '3_', '3_SCI-E引用明细表_已汇总.xlsx',
+                                                            merge_inputs('3_'))
+        merge_all_and_sum_all.merge_excel_files_with_continuous_citation_numbers(output_folder, '4_',
+                                                                                 '4_SCI-E引用统计表_已汇总.xlsx',
+                                                                                 merge_inputs('4_'))
+        merge_all_and_sum_all.merge_excel_files_with_sequential_numbers(output_folder, '5_',
+                                                                        '5_SCI-E引用格式表_for_word_已汇总.xlsx',
+                                                                        merge_inputs('5_'))
+
+    def highlighted_savedrecs():
+        return sorted(glob.glob(os.path.join(output_folder, 'savedrecs*_highlighted.*')))
+
+    def files_to_merge():
+        return sorted(path for prefix in ('3_', '4_', '5_')
+                      for path in glob.glob(os.path.join(output_folder, prefix + '*.xlsx'))
+                      if path not in merged_paths)
+
+    def cached(stage_name, func, inputs, outputs, params=None):
+        def run():
+            run_cached(cache, stage_name, inputs() if callable(inputs) else inputs, outputs, func, params)
+        return run
+
+    return [
+        ('论文清单标序号', cached('论文清单标序号', number_references, [docx_path, sci_file_path],
+                           [references_path, numbered_sci_path])),
+        ('委托人姓名标红', cached('委托人姓名标红', highlight_client_name, [numbered_sci_path],
+                           [highlighted_sci_path], {'author': author_name})),
+        ('期刊影响因子统计', cached('期刊影响因子统计', count_journals,
+                            [sci_file_path, jif_path] + ([history_path] if history_path else []),
+                            [journal_report_path],
+                            {'multiple_categories': multiple_categories, 'trend_years': trend_years})),
+        ('自引高亮', highlight_self_citations),
+        ('引用明细与统计', cached('引用明细与统计', combine_papers,
+                            lambda: [txt_file_path] + highlighted_savedrecs(),
+                            combined_paths, {'dump_intermediate': dump_intermediate})),
+        ('汇总', cached('汇总', merge_outputs, files_to_merge, merged_paths)),
+    ]
+
+
+def run_client_chain(client_dir, output_folder, multiple_categories=False, use_cache=True,
+                     dump_intermediate=False, history_path=None, trend_years=None, file_workers=None,
+                     index_dir=None):
+    """
+    为一个委托人依次运行完整处理链；use_cache=True 时只重新运行输入有变化的阶段。
+    """
+    output_folder = os.path.abspath(output_folder)
+    os.makedirs(output_folder, exist_ok=True)
+
+    cache = load_cache(output_folder) if use_cache else None
+    for _, stage in build_client_stages(client_dir, output_folder, multiple_categories, cache, dump_intermediate,
+                                        history_path, trend_years, file_workers, index_dir):
+        stage()
+
+
+def client_output_names(client_dirs):
+    """
+    为每个委托人文件夹确定输出子文件夹名：默认为文件夹名；不同位置的委托人文件夹同名时，
+    在文件夹名后加上完整路径的短哈希加以区分，避免互相覆盖输出和缓存。
+    """
+    names = [os.path.basename(os.path.normpath(client_dir)) for client_dir in client_dirs]
+    output_names = {}
+    for client_dir, name in zip(client_dirs, names):
+        if names.count(name) > 1:
+            name = f"{name}_{hashlib.sha1(client_dir.encode('utf-8')).hexdigest()[:8]}"
+        output_names[client_dir] = name
+    return output_names
+
+
+def run_client(client_dir, output_root, multiple_categories=False, use_cache=True, dump_intermediate=False,
+               history_path=None, trend_years=None, file_workers=None, output_name=None, index_dir=None):
+    """
+    在子进程中处理一个委托人，返回 (委托人, 输出目录, 状态, 耗时秒数)；出错时不影响其他委托人。
+    输出写入 output_root 下的 output_name 子文件夹，默认与委托人文件夹同名。
+    """
+    client_name = os.path.basename(os.path.normpath(client_dir))
+    output_folder = os.path.abspath(os.path.join(output_root, output_name or client_name))
+    start_time = time.perf_counter()
+    try:
+        run_client_chain(client_dir, output_folder, multiple_categories, use_cache, dump_intermediate,
+                         history_path, trend_years, file_workers, index_dir)
+        status = '完成'
+    except (Exception, SystemExit):
+        status = '失败: ' + traceback.format_exc(limit=1).strip().splitlines()[-1]
+    return client_name, output_folder, status, time.perf_counter() - start_time
+
+
+def prepare_jif_indexes(client_dirs, index_dir):
+    """
+    为各委托人的期刊影响因子表构建索引，内容相同的表只构建一次；工作进程只读取已构建好的索引。
+    表不存在或无法读取时跳过，由该委托人自己的处理链报错。
+    """
+    for jif_path in sorted({os.path.join(client_dir, 'SCI-E收录数据', '期刊影响因子.xlsx') for client_dir in client_dirs}):
+        if not os.path.exists(jif_path):
+            continue
+        try:
+            jif_index.ensure_jif_index(jif_path, jif_index.default_index_path(jif_path, index_dir))
+        except Exception as error:
+            print(f"期刊影响因子索引构建失败: {jif_path}: {error}")
+
+
+def process_clients(client_dirs, output_root, max_workers=None, multiple_categories=False, use_cache=True,
+                    dump_intermediate=False, history_path=None, trend_years=None, file_workers=None):
+    """
+    用进程池并行处理多个委托人文件夹，打印并保存每个委托人的耗时汇总。
+    所有路径先转为绝对路径，各阶段只读写绝对路径，不依赖工作进程的当前目录。
+    期刊影响因子索引统一保存在 output_root 下的 .jif_index 目录，在启动进程池之前按不同的影响因子表各构建一次。
+    """
+    os.makedirs(output_root, exist_ok=True)
+    output_root = os.path.abspath(output_root)
+    client_dirs = [os.path.abspath(client_dir) for client_dir in client_dirs]
+    history_path = os.path.abspath(history_path) if history_path else None
+    output_names = client_output_names(client_dirs)
+    start_time = time.perf_counter()
+    results = []
+
+    index_dir = os.path.join(output_root, '.jif_index')
+    prepare_jif_indexes(client_dirs, index_dir)
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(run_client, client_dir, output_root, multiple_categories, use_cache,
+                                   dump_intermediate, history_path, trend_years, file_workers,
+                                   output_names[client_dir], index_dir)
+                   for client_dir in client_dirs]
+        for future in as_completed(futures):
+            client_name, output_folder, status, seconds = future.result()
+            print(f"[{status}] {client_name}: {seconds:.1f} 秒 -> {output_folder}")
+            results.append({'委托人': client_name, '状态': status, '耗时（秒）': round(seconds, 2),
+                            '输出目录': output_folder})
+
+    summary_df = pd.DataFrame(results, columns=['委托人', '状态', '耗时（秒）', '输出目录']).sort_values('委托人')
+    summary_path = os.path.join(output_root, '批量处理汇总.xlsx')
+    summary_df.to_excel(summary_path, index=False)
+
+    print(f"共处理 {len(client_dirs)} 个委托人，总耗时 {time.perf_counter() - start_time:.1f} 秒，汇总已保存到 {summary_path}")
+    return summary_df
+
+
+def main():
+    parser = argparse.ArgumentParser(description='批量并行处理多个委托人文件夹')
+    parser.add_argument('clients', nargs='+', help=r'委托人文件夹路径或通配符，例如 examples\*示例')
+    parser.add_argument('--output-root', default='data_output', help='输出根目录，每个委托人一个子文件夹')
+    parser.add_argument('--workers', type=int, default=None, help='并行进程数，默认使用全部 CPU 核心')
+    parser.add_argument('--multiple-categories', action='store_true',
+                        help='期刊统计表列出全部学科类别与分区，并另写学科类别统计工作表')
+    parser.add_argument('--no-cache', action='store_true', help='忽略阶段缓存，重新运行所有阶段')
+    parser.add_argument('--dump-intermediate', action='store_true',
+                        help='额外写出 citation_output.xlsx 和 citation_for_word.xlsx 中间文件以便调试')
+    parser.add_argument('--jif-history', default=None, help='影响因子历史库（由 jif_history.py 生成）')
+    parser.add_argument('--jif-years', type=int, nargs='+', default=None,
+                        help='期刊统计表中添加的历年影响因子列，默认为历史库中的全部年份')
+    parser.add_argument('--file-workers', type=int, default=None,
+                        help='每个委托人自引高亮时并行处理 savedrecs 文件的进程数，默认逐个处理')
+    args = parser.parse_args()
+
+    client_dirs = find_clients(args.clients)
+    if not client_dirs:
+        print("没有找到委托人文件夹。")
+        return
+
+    history_path = os.path.abspath(args.jif_history) if args.jif_history else None
+    process_clients(client_dirs, args.output_root, args.workers, args.multiple_categories, not args.no_cache,
+                    args.dump_intermediate, history_path, args.jif_years, args.file_workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+import os
+import time
+import random
+import argparse
+import tracemalloc
+import pandas as pd
+import xlwt
+from docx import Document
+
+from batch_process_clients import build_client_stages
+
+# 合成数据使用的拼音姓名、标题词汇和 WoS 导出列
+SURNAMES = ['Zhang', 'Li', 'Wang', 'Liu', 'Chen', 'Yang', 'Zhao', 'Huang', 'Zhou', 'Wu', 'Xu', 'Sun', 'Ma', 'Zhu']
+GIVEN_NAMES = ['Jian', 'Ming', 'Xiaohong', 'Wei', 'Fang', 'Lei', 'Yiming', 'Jing', 'Tao', 'Hua', 'Dean', 'Xinyu']
+WESTERN_NAMES = ['Smith, John', 'Doe, Jane', 'Muller, Anna', 'Rossi, Marco', 'Garcia, Lucia', 'Brown, David']
+TITLE_WORDS = ('analysis novel deep learning framework protein structure prediction cancer cell graph network '
+               'colour tumour alpha synuclein aggregation neuronal model efficient robust catalytic oxidation '
+               'thin film solar battery lithium ion electrode membrane transport quantum dot').split()
+CATEGORIES = ['ONCOLOGY', 'CELL BIOLOGY', 'CHEMISTRY, PHYSICAL', 'MATERIALS SCIENCE, MULTIDISCIPLINARY',
+              'ENGINEERING, ELECTRICAL & ELECTRONIC', 'COMPUTER SCIENCE, ARTIFICIAL INTELLIGENCE']
+SAVEDRECS_COLUMNS = ['Publication Type', 'Authors', 'Book Authors', 'Book Editors', 'Book Group Authors',
+                     'Author Full Names', 'Book Author Full Names', 'Group Authors', 'Article Title', 'Source Title',
+                     'Publication Year', 'Volume', 'Issue', 'Start Page', 'End Page', 'Article Number', 'DOI']
+
+
+def random_issn(rng):
+    return f"{rng.randint(0, 9999):04d}-{rng.randint(0, 999):03d}{rng.choice('0123456789X')}"
+
+
+def random_pinyin_author(rng):
+    return f"{rng.choice(SURNAMES)}, {rng.choice(GIVEN_NAMES)}"
+
+
+def random_title(rng, serial):
+    words = [rng.choice(TITLE_WORDS) for _ in range(rng.randint(6, 14))]
+    return ' '.join(words).capitalize() + f' {serial}'
+
+
+def short_author(full_name):
+    surname, given_name = full_name.split(', ')
+    return f"{surname}, {given_name[0]}"
+
+
+def generate_jif_table(path, journal_count, rng):
+    """
+    生成 JCR 形状的期刊影响因子表（每个期刊按学科类别可能占多行），返回期刊列表。
+    """
+    journals = []
+    rows = []
+    for serial in range(journal_count):
+        name = f"Journal of {rng.choice(TITLE_WORDS).capitalize()} {rng.choice(TITLE_WORDS).capitalize()} {serial}"
+        journal = {'name': name, 'issn': random_issn(rng), 'eissn': random_issn(rng)}
+        journals.append(journal)
+        jif = round(rng.uniform(0.5, 30), 1)
+        for category in rng.sample(CATEGORIES, rng.randint(1, 3)):
+            rows.append({
+                'Journal name': name.upper(),
+                'JCR Abbreviation': ' '.join(word[:4].upper() for word in name.split()),
+                'ISSN': journal['issn'],
+                'eISSN': journal['eissn'],
+                'Category': category,
+                'Edition': 'SCIE',
+                '2023 JIF': jif,
+                'JIF Quartile': rng.choice(['Q1', 'Q2', 'Q3', 'Q4']),
+            })
+    pd.DataFrame(rows).to_excel(path, index=False)
+    return journals
+
+
+def generate_client_papers(paper_count, journals, client_author, rng):
+    """
+    生成委托人的论文记录，部分使用文献号码代替页码。
+    """
+    papers = []
+    for serial in range(paper_count):
+        co_authors = [random_pinyin_author(rng) for _ in range(rng.randint(1, 6))]
+        authors = co_authors[:]
+        authors.insert(rng.randint(0, len(authors)), client_author)
+        start_page = rng.randint(1, 3000)
+        use_article_number = rng.random() < 0.3
+        papers.append({
+            'title': random_title(rng, serial),
+            'journal': rng.choice(journals),
+            'authors': authors,
+            'year': rng.randint(2015, 2024),
+            'volume': rng.randint(1, 200),
+            'issue': rng.randint(1, 24),
+            'start_page': None if use_article_number else start_page,
+            'end_page': None if use_article_number else start_page + rng.randint(1, 20),
+            'article_number': f"e{rng.randint(10000, 99999)}" if use_article_number else None,
+        })
+    return papers
+
+
+def generate_paper_list_docx(path, papers):
+    """
+    生成 GB/T 7714 格式的委托人论文清单 .docx。
+    """
+    document = Document()
+    for paper in papers:
+        authors = ', '.join(f"{a.split(', ')[0]} {a.split(', ')[1][0]}" for a in paper['authors'][:3])
+        if len(paper['authors']) > 3:
+            authors += ', et al'
+        pages = paper['article_number'] or f"{paper['start_page']}-{paper['end_page']}"
+        document.add_paragraph(f"{authors}. {paper['title']}[J]. {paper['journal']['name']}, "
+                               f"{paper['year']}, {paper['volume']}({paper['issue']}): {pages}.")
+    document.save(path)
+
+
+def generate_scie_export(path, papers, rng):
+    """
+    生成 SCI-E收录.xlsx；少量标题带有拼写差异，以覆盖模糊匹配。
+    """
+    rows = []
+    for paper in papers:
+        title = paper['title']
+        if rng.random() < 0.05:
+            title = title.replace('colour', 'color').replace('tumour', 'tumor').replace('e', 'ee', 1)
+        rows.append({
+            'Publication Type': 'J',
+            'Authors': '; '.join(short_author(a) for a in paper['authors']),
+            'Author Full Names': '; '.join(paper['authors']),
+            'Article Title': title,
+            'Source Title': paper['journal']['name'].upper(),
+            'ISSN': paper['journal']['issn'],
+            'eISSN': paper['journal']['eissn'],
+            'Publication Year': paper['year'],
+            'Volume': paper['volume'],
+            'Issue': paper['issue'],
+            'Start Page': paper['start_page'],
+            'End Page': paper['end_page'],
+            'Article Number': paper['article_number'],
+        })
+    pd.DataFrame(rows).to_excel(path, index=False)
+
+
+def generate_savedrecs(path, paper, citing_count, rng):
+    """
+    生成一个 savedrecs (k).xls 引用记录导出文件，约三分之一为自引。
+    """
+    workbook = xlwt.Workbook()
+    sheet = workbook.add_sheet('savedrecs')
+    for col, header in enumerate(SAVEDRECS_COLUMNS):
+        sheet.write(0, col, header)
+
+    for row in range(1, citing_count + 1):
+        authors = rng.sample(WESTERN_NAMES, 2) + [random_pinyin_author(rng)]
+        if rng.random() < 0.33:
+            authors.insert(0, rng.choice(paper['authors']))
+        values = ['J', '; '.join(short_author(a) for a in authors), '', '', '', '; '.join(authors), '', '',
+                  random_title(rng, row), 'Citing Journal', paper['year'] + 1, rng.randint(1, 50),
+                  rng.randint(1, 12), rng.randint(1, 500), rng.randint(501, 900), '', '']
+        for col, value in enumerate(values):
+            sheet.write(row, col, value)
+    workbook.save(path)
+
+
+def generate_citation_inputs(citation_folder, papers, citing_per_paper, rng):
+    """
+    生成 SCI-E引用格式.txt 和对应的 savedrecs 文件；约四分之一的论文无引用，部分论文占两行。
+    返回引用记录总数和 txt 行数。
+    """
+    lines = []
+    total_citing = 0
+    savedrecs_number = 0
+
+    for paper in papers:
+        if rng.random() < 0.25:
+            lines.extend(['N/A', ''])
+            continue
+
+        pages = paper['article_number'] or f"{paper['start_page']}-{paper['end_page']}"
+        lines.append('\t'.join(['; '.join(paper['authors']), paper['title'], 'Article', paper['journal']['name'],
+                                str(paper['year']), 'English', str(paper['volume']), str(paper['issue']), pages]))
+        if rng.random() < 0.2:
+            lines.append('\t'.join(['', '', '', 'Erratum', '', '', '', '', '']))
+        lines.append('')
+
+        citing_count = max(1, int(rng.expovariate(1 / citing_per_paper)))
+        file_name = 'savedrecs.xls' if savedrecs_number == 0 else f'savedrecs ({savedrecs_number}).xls'
+        generate_savedrecs(os.path.join(citation_folder, file_name), paper, citing_count, rng)
+        savedrecs_number += 1
+        total_citing += citing_count
+
+    with open(os.path.join(citation_folder, 'SCI-E引用格式.txt'), 'w', encoding='utf-8') as file:
+        file.write('\n'.join(lines))
+
+    return total_citing, len(lines)
+
+
+def generate_client(client_dir, paper_count=200, citing_per_paper=20, journal_count=2000, seed=0):
+    """
+    生成一个与真实委托人文件夹结构相同的合成数据集，返回各类输入的行数。
+    """
+    rng = random.Random(seed)
+    scie_folder = os.path.join(client_dir, 'SCI-E收录数据')
+    citation_folder = os.path.join(client_dir, 'SCI-E引用数据')
+    os.makedirs(scie_folder, exist_ok=True)
+    os.makedirs(citation_folder, exist_ok=True)
+
+    client_author = 'Zhang, Jian'
+    journals = generate_jif_table(os.path.join(scie_folder, '期刊影响因子.xlsx'), journal_count, rng)
+    papers = generate_client_papers(paper_count, journals, client_author, rng)
+
+    generate_paper_list_docx(os.path.join(client_dir, '张健论文清单.docx'), papers)
+    generate_scie_export(os.path.join(scie_folder, 'SCI-E收录.xlsx'), papers, rng)
+    pd.DataFrame({
+        '论文清单序号': range(1, paper_count + 1),
+        'Author Full Names': ['; '.join(paper['authors']) for paper in papers],
+    }).to_excel(os.path.join(client_dir, 'papers.xlsx'), index=False)
+
+    total_citing, txt_lines = generate_citation_inputs(citation_folder, papers, citing_per_paper, rng)
+
+    return {'papers': paper_count, 'citing': total_citing, 'txt_lines': txt_lines}
+
+
+def stage_row_counts(sizes):
+    """
+    每个阶段用于计算吞吐量的行数。
+    """
+    return {
+        '论文清单标序号': sizes['papers'],
+        '委托人姓名标红': sizes['papers'],
+        '期刊影响因子统计': sizes['papers'],
+        '自引高亮': sizes['citing'],
+        '引用明细与统计': sizes['txt_lines'] + sizes['citing'],
+        '汇总': sizes['citing'],
+    }
+
+
+def run_benchmark(work_folder, paper_count=200, citing_per_paper=20, journal_count=2000, seed=0,
+                  measure_memory=True):
+    """
+    生成合成数据并逐阶段运行完整处理链，记录每个阶段的耗时、吞吐量（行/秒）和峰值内存。
+    """
+    work_folder = os.path.abspath(work_folder)
+    client_dir = os.path.join(work_folder, '张健示例')
+    output_folder = os.path.join(work_folder, 'data_output')
+    os.makedirs(output_folder, exist_ok=True)
+
+    start_time = time.perf_counter()
+    sizes = generate_client(client_dir, paper_count, citing_per_paper, journal_count, seed)
+    print(f"合成数据已生成（{time.perf_counter() - start_time:.1f} 秒）: {sizes}")
+
+    row_counts = stage_row_counts(sizes)
+
+    results = []
+    if measure_memory:
+        tracemalloc.start()
+    for stage_name, stage in build_client_stages(client_dir, output_folder):
+        if measure_memory:
+            tracemalloc.reset_peak()
+        start_time = time.perf_counter()
+        stage()
+        seconds = time.perf_counter() - start_time
+        peak_mb = tracemalloc.get_traced_memory()[1] / 1024 / 1024 if measure_memory else None
+        results.append({
+            '阶段': stage_name,
+            '行数': row_counts[stage_name],
+            '耗时（秒）': round(seconds, 3),
+            '行/秒': round(row_counts[stage_name] / seconds, 1) if seconds else None,
+            '峰值内存（MB）': round(peak_mb, 1) if peak_mb is not None else None,
+        })
+    if measure_memory:
+        tracemalloc.stop()
+
+    report_df = pd.DataFrame(results)
+    report_path = os.path.join(work_folder, 'benchmark_report.xlsx')
+    report_df.to_excel(report_path, index=False)
+
+    print(report_df.to_string(index=False))
+    print(f"基准测试结果已保存到 {report_path}")
+    return report_df
+
+
+def main():
+    parser = argparse.ArgumentParser(description='用合成的 WoS 形状数据对完整处理链逐阶段计时')
+    parser.add_argument('--work-folder', default='benchmark_data', help='合成数据和输出的存放目录')
+    parser.add_argument('--papers', type=int, default=200, help='委托人论文数（SCI-E收录行数）')
+    parser.add_argument('--citing', type=int, default=20, help='每篇被引论文的平均引用记录数')
+    parser.add_argument('--journals', type=int, default=2000, help='期刊影响因子表中的期刊数')
+    parser.add_argument('--seed', type=int, default=0, help='随机种子')
+    parser.add_argument('--no-memory', action='store_true', help='不统计峰值内存（tracemalloc 会拖慢运行）')
+    args = parser.parse_args()
+
+    run_benchmark(args.work_folder, args.papers, args.citing, args.journals, args.seed, not args.no_memory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import os
+import json
+
+
+def sidecar_path(highlighted_file):
+    """
+    高亮文件对应的自引统计文件路径，例如 savedrecs (1)_highlighted.xlsx -> savedrecs (1)_highlighted.json。
+    """
+    return os.path.splitext(highlighted_file)[0] + '.json'
+
+
+def write_sidecar(highlighted_file, self_citation_flags, source_file=None):
+    """
+    在高亮文件旁写入自引统计：总被引数、自引数、他引数和每行记录是否为自引。
+    """
+    flags = [bool(flag) for flag in self_citation_flags]
+    self_count = sum(flags)
+    data = {
+        'source': os.path.basename(source_file) if source_file else None,
+        'highlighted': os.path.basename(highlighted_file),
+        'total': len(flags),
+        'self': self_count,
+        'external': len(flags) - self_count,
+        'self_citation_flags': [int(flag) for flag in flags],
+    }
+    with open(sidecar_path(highlighted_file), 'w', encoding='utf-8') as file:
+        json.dump(data, file, ensure_ascii=False)
+    return data
+
+
+def read_sidecar(highlighted_file):
+    """
+    读取高亮文件的自引统计；统计文件不存在或早于高亮文件（已过期）时返回 None。
+    """
+    path = sidecar_path(highlighted_file)
+    if not os.path.exists(path):
+        return None
+    if os.path.exists(highlighted_file) and os.path.getmtime(path) < os.path.getmtime(highlighted_file):
+        return None
+    with open(path, 'r', encoding='utf-8') as file:
+        return json.load(file)
@@ -1,7 +1,16 @@
+import os
 import pandas as pd
-from openpyxl import load_workbook
+from openpyxl import load_workbook, Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import PatternFill, Font, Border, Side, Alignment
 from copy import copy  # 导入copy函数
+from citation_sidecar import read_sidecar
+from combine_citations import (iter_citation_rows, citation_cell, pad_citation_rows, citation_for_word_frame,
+                               write_citation_rows, process_xlsx)
+
+# 定义黄色填充（自引记录的高亮颜色）
+yellow_fill = PatternFill(start_color="FFFF00", end_color="FFFF00", fill_type="solid")
+
 
 def copy_cell_style(src_cell, dest_cell):
     # Set font to Arial
@@ -23,181 +32,207 @@ def copy_cell_style(src_cell, dest_cell):
     # Copy protection
     dest_cell.protection = copy(src_cell.protection)
 
-    # Copy alignment
-    dest_cell.alignment = copy(src_cell.alignment)
 
-# 读取 citation_output.xlsx 文件
-citation_file_path = 'data_output/citation_output.xlsx'
-citation_wb = load_workbook(citation_file_path)
-citation_ws = citation_wb.active
+def copy_cell(src_cell, detail_ws):
+    """
+    原样复制单元格的值和样式，生成写入流式工作表的单元格。
+    """
+    new_cell = WriteOnlyCell(detail_ws, value=src_cell.value)
+    if getattr(src_cell, 'has_style', False):
+        new_cell.font = copy(src_cell.font)
+        new_cell.border = copy(src_cell.border)
+        new_cell.fill = copy(src_cell.fill)
+        new_cell.number_format = src_cell.number_format
+        new_cell.protection = copy(src_cell.protection)
+        new_cell.alignment = copy(src_cell.alignment)
+    return new_cell
+
+
+def append_savedrecs_rows(detail_ws, savedrecs_file_path):
+    """
+    将 savedrecs 高亮文件的全部行（含表头）逐行写入引用明细表，并在其后留两行空行。
+    返回总被引数和自引数：优先读取高亮步骤写出的自引统计文件，没有时统计 F 列为黄色填充的记录。
+    """
+    sidecar = read_sidecar(savedrecs_file_path)
+
+    savedrecs_wb = load_workbook(savedrecs_file_path, read_only=True)
+    savedrecs_ws = savedrecs_wb.active
+
+    # 流式写出的文件没有记录表格范围，需要先扫描一遍求出列数；较短的行补齐到整表宽度，补出的空单元格同样使用 Arial
+    if savedrecs_ws.max_column is None:
+        savedrecs_ws.calculate_dimension(force=True)
+
+    savedrecs_row_count = 0
+    self_citations = 0
+    for row in savedrecs_ws.iter_rows(max_col=savedrecs_ws.max_column):
+        if sidecar is None and savedrecs_row_count > 0 and len(row) > 5 and row[5].fill is not None \
+                and row[5].fill.start_color.index == yellow_fill.start_color.index:  # 假设 F 列是第 6 列，索引为 5
+            self_citations += 1
 
-# 获取 citation_output.xlsx 文件的内容
-citation_df = pd.read_excel(citation_file_path, header=None)  # 没有列名
+        new_row = []
+        for cell in row:
+            new_cell = WriteOnlyCell(detail_ws, value=cell.value)
+            if getattr(cell, 'has_style', False):
+                copy_cell_style(cell, new_cell)  # 复制单元格样式
+            else:
+                new_cell.font = Font(name='Arial')
+                new_cell.alignment = Alignment(horizontal='left')
+            new_row.append(new_cell)
+        detail_ws.append(new_row)
+        savedrecs_row_count += 1
+
+    savedrecs_wb.close()
+
+    # 在插入内容的下方再插入两行空行
+    detail_ws.append([])
+    detail_ws.append([])
+
+    if sidecar is not None:
+        return sidecar['total'], sidecar['self']
+    return savedrecs_row_count - 1, self_citations
+
+
+def build_citation_detail(output_folder, citation_rows=None):
+    """
+    顺序读取 citation_output.xlsx，在每个有引用的被引文献之后接上对应 savedrecs 文件的内容，
+    一次写出 3_SCI-E引用明细表.xlsx，并返回每篇被引文献的 [被引文献序号, 总被引数, 自引数, 他引数]。
+    传入 citation_rows（由 txt 解析出的行）时直接使用内存中的数据，不再读取 citation_output.xlsx。
+    """
+    detail_wb = Workbook(write_only=True)
+
+    if citation_rows is None:
+        # 读取 citation_output.xlsx 文件
+        citation_file_path = os.path.join(output_folder, 'citation_output.xlsx')
+        citation_wb = load_workbook(citation_file_path, read_only=True)
+        citation_ws = citation_wb.active
+        detail_ws = detail_wb.create_sheet(citation_ws.title)
+        rows = ([copy_cell(cell, detail_ws) for cell in row] for row in citation_ws.iter_rows())
+    else:
+        citation_wb = None
+        detail_ws = detail_wb.create_sheet('Sheet1')
+        rows = ([citation_cell(detail_ws, value) for value in values] for values in pad_citation_rows(citation_rows))
 
-# 初始化 new_number 和统计数据
-new_number = 0
-stats_data = []
+    # 初始化 new_number 和统计数据
+    new_number = 0
+    stats_data = []
+    pending_stats = None  # 等待接上 savedrecs 内容的被引文献统计行
 
-# 获取 A 列和 B 列的数据
-a_column = citation_df[0]
-b_column = citation_df[1]
+    def flush_pending():
+        nonlocal new_number
+        # 确定插入的 savedrecs 文件路径
+        savedrecs_file_name = 'savedrecs_highlighted.xlsx' if new_number == 0 else f'savedrecs ({new_number})_highlighted.xlsx'
+        total_citations, self_citations = append_savedrecs_rows(
+            detail_ws, os.path.join(output_folder, savedrecs_file_name))
+        pending_stats[1:] = [total_citations, self_citations, total_citations - self_citations]  # 他引数
+        new_number += 1  # 更新 new_number
 
-# 定义黄色填充的颜色索引
-yellow_fill = PatternFill(start_color="FFFF00", end_color="FFFF00", fill_type="solid")
+    # 遍历引用格式表的行，A 列非空的行是一个被引文献的开始
+    for row in rows:
+        old_number = row[0].value if row else None  # 被引文献序号
+        if old_number is not None and str(old_number).strip():
+            if pending_stats is not None:
+                flush_pending()
 
-# 遍历 citation_output.xlsx 文件的行
-row_offset = 0
-for index in range(len(citation_df)):
-    old_number = a_column[index]  # 被引文献序号
-    b_column_value = b_column[index]  # B列值
+            b_column_value = row[1].value if len(row) > 1 else None  # B列值
+            stats = [old_number, 0, 0, 0]
+            stats_data.append(stats)
+            pending_stats = stats if b_column_value != '无引用' else None
 
-    total_citations = 0
-    self_citations = 0
-    external_citations = 0
+        detail_ws.append(row)
 
-    if pd.notna(old_number) and b_column_value != '无引用':
-        # 查找下一个被引文献的位置
-        next_citation_index = index + 1
-        while next_citation_index < len(citation_df) and pd.isna(a_column[next_citation_index]):
-            next_citation_index += 1
+    if pending_stats is not None:
+        flush_pending()
 
-        # 确定插入的 savedrecs 文件路径
-        savedrecs_file_name = 'savedrecs_highlighted.xlsx' if new_number == 0 else f'savedrecs ({new_number})_highlighted.xlsx'
-        savedrecs_file_path = f'data_output/{savedrecs_file_name}'
-
-        # 读取 savedrecs 文件内容
-        savedrecs_wb = load_workbook(savedrecs_file_path)
-        savedrecs_ws = savedrecs_wb.active
-
-        # 将生成器转换为列表以获取行数
-        savedrecs_rows = list(savedrecs_ws.iter_rows(values_only=False))
-        savedrecs_row_count = len(savedrecs_rows)
-        total_citations = savedrecs_row_count - 1  # 总被引数
-
-        # 计算自引数
-        for row in savedrecs_rows[1:]:
-            cell = row[5]  # 假设 F 列是第 6 列，索引为 5
-            if cell.fill.start_color.index == yellow_fill.start_color.index:  # 检查填充颜色
-                self_citations += 1
-
-        external_citations = total_citations - self_citations  # 他引数
-
-        # 确定插入位置
-        if next_citation_index < len(citation_df):
-            insert_position = next_citation_index + row_offset + 1  # 下一个被引文献的前一行
-        else:
-            # 找到第一个空行位置
-            insert_position = len(citation_df) + row_offset + 1
-
-        # 复制 savedrecs 文件内容到插入位置
-        for i, row in enumerate(savedrecs_rows):
-            citation_ws.insert_rows(insert_position + i)  # 插入 savedrecs 文件内容
-            for j, cell in enumerate(row):
-                new_cell = citation_ws.cell(row=insert_position + i, column=j + 1, value=cell.value)
-                copy_cell_style(cell, new_cell)  # 复制单元格样式
+    if citation_wb is not None:
+        citation_wb.close()
 
-        # Format the inserted rows
-        for row in citation_ws.iter_rows(min_row=insert_position, max_row=insert_position + savedrecs_row_count - 1,
-                                         min_col=1, max_col=citation_ws.max_column):
-            for cell in row:
-                # Ensure Arial font, left alignment, and no borders
-                cell.font = Font(name='Arial')
-                cell.alignment = Alignment(horizontal='left')
-                cell.border = Border(left=Side(border_style=None), right=Side(border_style=None),
-                                     top=Side(border_style=None), bottom=Side(border_style=None))
+    # 保存最终结果为 citation_papers.xlsx 文件
+    detail_wb.save(os.path.join(output_folder, '3_SCI-E引用明细表.xlsx'))
 
-        # 在插入内容的下方再插入两行空行
-        citation_ws.insert_rows(insert_position + savedrecs_row_count, 2)
+    return stats_data
 
-        row_offset += savedrecs_row_count + 2  # 增加偏移量
-        new_number += 1  # 更新 new_number
-        index = next_citation_index  # 跳到下一个被引文献的位置
 
-    else:
-        total_citations = 0
-        self_citations = 0
-        external_citations = 0
-
-    # 记录统计数据
-    if pd.notna(old_number):
-        stats_data.append([old_number, total_citations, self_citations, external_citations])
-
-# 创建统计 DataFrame 并保存为 count.xlsx
-stats_df = pd.DataFrame(stats_data, columns=['被引文献序号', '总被引数', '自引数', '他引数'])
-stats_df = stats_df[stats_df['被引文献序号'].notna()]  # 删除被引文献下方A列为空的行
-stats_df.to_excel('data_output/4_SCI-E引用统计表.xlsx', index=False)
-
-# 保存最终结果为 citation_papers.xlsx 文件
-citation_wb.save('data_output/3_SCI-E引用明细表.xlsx')
-
-# Load citation statistics from count.xlsx
-count_df = pd.read_excel('data_output/4_SCI-E引用统计表.xlsx')
-
-# Load citation_for_word.xlsx into a DataFrame
-citation_for_word_path = 'data_output/citation_for_word.xlsx'
-citation_for_word_df = pd.read_excel(citation_for_word_path, header=None)
-
-# Create new columns in DataFrame for total citations and external citations
-citation_for_word_df['总被引数'] = None
-citation_for_word_df['他引数'] = None
-
-# Create a dictionary for quick lookup of statistics
-stats_dict = count_df.set_index('被引文献序号').to_dict(orient='index')
-
-# Fill the new columns with data from count.xlsx
-for idx, row in citation_for_word_df.iterrows():
-    citation_number = row[0]
-    if citation_number in stats_dict:
-        citation_stats = stats_dict[citation_number]
-        citation_for_word_df.at[idx, '总被引数'] = citation_stats['总被引数']
-        citation_for_word_df.at[idx, '他引数'] = citation_stats['他引数']
-
-# Remove the first four characters from column A
-citation_for_word_df[0] = citation_for_word_df[0].astype(str).str[4:]
-
-# Remove rows where all cells are empty
-citation_for_word_df = citation_for_word_df.dropna(how='all').reset_index(drop=True)
-
-# Save updated DataFrame to a new Excel file
-updated_file_path = 'data_output/citations_count_all.xlsx'
-with pd.ExcelWriter(updated_file_path, engine='openpyxl') as writer:
-    citation_for_word_df.to_excel(writer, index=False, header=False)
-    workbook = writer.book
-    worksheet = writer.sheets['Sheet1']
-
-    # Apply Arial font to all cells and remove borders
+def combine_citation_papers(output_folder, citation_rows=None, citation_for_word_df=None):
+    """
+    将各 savedrecs 高亮文件接入引用明细表，统计总被引数、自引数、他引数，并生成 for_word 引用格式表。
+    citation_rows 和 citation_for_word_df 为内存中的引用格式表，未传入时读取 citation_output.xlsx 和 citation_for_word.xlsx。
+    """
+    stats_data = build_citation_detail(output_folder, citation_rows)
+
+    # 创建统计 DataFrame 并保存为 count.xlsx
+    stats_df = pd.DataFrame(stats_data, columns=['被引文献序号', '总被引数', '自引数', '他引数'])
+    stats_df = stats_df[stats_df['被引文献序号'].notna()]  # 删除被引文献下方A列为空的行
+    stats_df.to_excel(os.path.join(output_folder, '4_SCI-E引用统计表.xlsx'), index=False)
+
+    if citation_for_word_df is None:
+        # Load citation_for_word.xlsx into a DataFrame
+        citation_for_word_path = os.path.join(output_folder, 'citation_for_word.xlsx')
+        citation_for_word_df = pd.read_excel(citation_for_word_path, header=None)
+
+    # 按被引文献序号合并总被引数和他引数
+    citation_for_word_df = citation_for_word_df.merge(stats_df[['被引文献序号', '总被引数', '他引数']],
+                                                      how='left', left_on=0, right_on='被引文献序号')
+    citation_for_word_df = citation_for_word_df.drop(columns='被引文献序号')
+
+    # Remove the first four characters from column A
+    citation_for_word_df[0] = citation_for_word_df[0].astype(str).str[4:]
+
+    # Remove rows where all cells are empty
+    empty_cells = citation_for_word_df.isna() | citation_for_word_df.astype(str).apply(
+        lambda column: column.str.strip().eq(''))
+    citation_for_word_df = citation_for_word_df[~empty_cells.all(axis=1)].reset_index(drop=True)
+    citation_for_word_df[['总被引数', '他引数']] = citation_for_word_df[['总被引数', '他引数']].astype('Int64')
+
+    write_for_word_table(citation_for_word_df, os.path.join(output_folder, '5_SCI-E引用格式表_for_word.xlsx'))
+
+    print("Data has been processed, saved, and formatted.")
+
+
+def write_for_word_table(citation_for_word_df, output_path):
+    """
+    逐行写出 for_word 引用格式表（无表头），所有单元格使用 Arial 字体、左对齐、无框线。
+    """
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet('Sheet1')
+
     arial_font = Font(name='Arial')
-    for row in worksheet.iter_rows(min_row=1, max_row=worksheet.max_row, min_col=1, max_col=worksheet.max_column):
-        for cell in row:
+    left_alignment = Alignment(horizontal='left')
+    no_border = Border(left=Side(border_style=None), right=Side(border_style=None),
+                       top=Side(border_style=None), bottom=Side(border_style=None))
+
+    for values in citation_for_word_df.astype(object).where(citation_for_word_df.notna(), None).itertuples(
+            index=False, name=None):
+        row = []
+        for value in values:
+            cell = WriteOnlyCell(worksheet, value=value)
             cell.font = arial_font
-            cell.alignment = Alignment(horizontal='left')
-            cell.border = Border(left=Side(border_style=None), right=Side(border_style=None),
-                                 top=Side(border_style=None), bottom=Side(border_style=None))
+            cell.alignment = left_alignment
+            cell.border = no_border
+            row.append(cell)
+        worksheet.append(row)
+
+    workbook.save(output_path)
+
 
-print("Data has been processed, saved, and formatted.")
+def combine_citation_papers_from_txt(txt_file_path, output_folder, dump_intermediate=False):
+    """
+    内存流水线：只解析一次 SCI-E引用格式.txt，在内存中完成删列、合并续行和引用数合并，
+    只写出 3_、4_、5_ 三个最终文件。dump_intermediate=True 时另外写出 citation_output.xlsx 和
+    citation_for_word.xlsx 以便调试。
+    """
+    citation_rows = list(iter_citation_rows(txt_file_path))
 
-# Load the cleaned Excel file
-wb = load_workbook(filename='data_output/citations_count_all.xlsx')
-ws = wb.active  # Assuming we want to modify the active sheet
+    if dump_intermediate:
+        citation_output_path = os.path.join(output_folder, 'citation_output.xlsx')
+        write_citation_rows(citation_rows, citation_output_path)
+        process_xlsx(citation_output_path, os.path.join(output_folder, 'citation_for_word.xlsx'))
 
-# Define a function to check if a row is empty
-def is_row_empty(row):
-    for cell in row:
-        if cell.value is not None and str(cell.value).strip():
-            return False
-    return True
+    combine_citation_papers(output_folder, citation_rows, citation_for_word_frame(citation_rows))
 
-# Reverse iterate over rows to avoid index interference when deleting
-rows_to_delete = []
-for idx, row in enumerate(ws.iter_rows(min_row=1, max_row=ws.max_row, min_col=1, max_col=ws.max_column), start=1):
-    if is_row_empty(row):
-        rows_to_delete.append(idx)
 
-# Delete rows
-for row_idx in reversed(rows_to_delete):
-    ws.delete_rows(row_idx)
+def main():
+    combine_citation_papers('data_output')
 
-# Save the cleaned file
-wb.save('data_output/5_SCI-E引用格式表_for_word.xlsx')  # Save as new file to avoid overwriting original
 
-print("Empty rows have been removed and the file has been saved.")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
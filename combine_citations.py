@@ -1,118 +1,226 @@
+from copy import copy
 import pandas as pd
-from openpyxl import load_workbook
+from openpyxl import load_workbook, Workbook
+from openpyxl.cell import Cell, WriteOnlyCell
 from openpyxl.styles import Font
 
-def convert_txt_to_xlsx(txt_file_path, xlsx_file_path):
-    with open(txt_file_path, 'r', encoding='utf-8') as file:
-        lines = file.readlines()
+# 需要替换为“无引用”的值
+NO_CITATION_VALUES = {"NA", "n/a", "N/A", "无", "-", "——"}
+
+# 引用格式表的字体：有内容的单元格加粗
+bold_font = Font(bold=True, name='微软雅黑')
+normal_font = Font(name='微软雅黑')
+
+# process_xlsx 删除的列：D, G, I, J（从 1 开始）
+COLUMNS_TO_DELETE = {4, 7, 9, 10}
 
-    data = []
+
+def iter_citation_rows(txt_file_path):
+    """
+    逐行读取引用格式 txt 文件，生成每一行的单元格值：空行分隔不同被引文献，
+    每个被引文献的第一行在 A 列标注“被引文献N”，其余行 A 列为空；无引用标记统一替换为“无引用”。
+    """
     row_num = 1
     new_row = True
 
-    for line in lines:
-        stripped_line = line.strip()
-        if stripped_line == "":
-            new_row = True
-        else:
+    with open(txt_file_path, 'r', encoding='utf-8') as file:
+        for line in file:
+            stripped_line = line.strip()
+            if stripped_line == "":
+                new_row = True
+                continue
+
             if new_row:
-                row_data = [f"被引文献{row_num}"] + stripped_line.split('\t')
+                label = f"被引文献{row_num}"
                 row_num += 1
                 new_row = False
             else:
-                row_data = [""] + stripped_line.split('\t')
-            data.append(row_data)
+                label = ""
 
-    # Create a DataFrame
-    df = pd.DataFrame(data)
+            yield [label] + ["无引用" if value in NO_CITATION_VALUES else value
+                             for value in stripped_line.split('\t')]
 
-    # Replace unwanted values with "无引用"
-    replacements = ["NA", "n/a", "N/A", "无", "-", "——"]
-    df.replace(replacements, "无引用", inplace=True)
 
-    # Write to Excel file
-    with pd.ExcelWriter(xlsx_file_path, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False, header=False)
-        workbook = writer.book
-        worksheet = writer.sheets['Sheet1']
-
-        # Apply bold font to cells with content
-        bold_font = Font(bold=True, name='微软雅黑')
-        normal_font = Font(name='微软雅黑')
-        for row in worksheet.iter_rows(min_row=1, max_row=worksheet.max_row, min_col=1, max_col=worksheet.max_column):
-            for cell in row:
-                cell.font = bold_font if cell.value else normal_font
-
-
-def process_xlsx(input_file_path, output_file_path):
-    wb = load_workbook(input_file_path)
-    ws = wb.active
-
-    # Delete specific columns: D, G, I, J
-    columns_to_delete = [4, 7, 9, 10]  # 1-based index for columns
-    for col in sorted(columns_to_delete, reverse=True):
-        ws.delete_cols(col)
-
-    max_row = ws.max_row
-    col_count = ws.max_column
+def citation_row_width(txt_file_path):
+    """
+    先快速扫描一遍引用格式 txt 文件，只数每行的制表符，返回 iter_citation_rows 生成的最长一行的宽度（含 A 列）。
+    """
+    with open(txt_file_path, 'r', encoding='utf-8') as file:
+        return max((line.strip().count('\t') + 2 for line in file if line.strip()), default=0)
 
-    # To store merged cell ranges for column A
-    merged_ranges = []
 
-    # Process column A
-    start_row = 1
-    while start_row <= max_row:
-        cell_value = ws.cell(row=start_row, column=1).value
-        if cell_value:
+def convert_txt_to_xlsx(txt_file_path, xlsx_file_path):
+    """
+    将引用格式 txt 文件逐行写入 Excel，写入时即设置字体：有内容的单元格为微软雅黑加粗，其余为微软雅黑常规。
+    整表宽度由 citation_row_width 预先扫描得到，各行边读边补齐、边写出，不把整个文件读入内存。
+    """
+    write_citation_rows(iter_citation_rows(txt_file_path), xlsx_file_path, citation_row_width(txt_file_path))
+
+
+def pad_citation_row(row, width):
+    """
+    把一行补齐到 width 列（补 None），与按表格写出时一样，空白单元格也会设置字体。
+    """
+    return list(row) + [None] * (width - len(row))
+
+
+def pad_citation_rows(citation_rows):
+    """
+    把内存中的各行（列表）补齐到最长一行的宽度。
+    """
+    width = max((len(row) for row in citation_rows), default=0)
+    return [pad_citation_row(row, width) for row in citation_rows]
+
+
+def write_citation_rows(citation_rows, xlsx_file_path, width=None):
+    """
+    将引用格式行逐行写入 Excel（citation_output.xlsx 格式），较短的行补齐到整表宽度。
+    传入整表宽度 width 时逐行补齐后流式写出，citation_rows 可以是生成器；未传入时 citation_rows 须为列表。
+    """
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet('Sheet1')
+
+    rows = pad_citation_rows(citation_rows) if width is None else (
+        pad_citation_row(row, width) for row in citation_rows)
+    for values in rows:
+        worksheet.append([citation_cell(worksheet, value) for value in values])
+
+    workbook.save(xlsx_file_path)
+
+
+def citation_cell(worksheet, value):
+    """
+    生成写入流式工作表的引用格式单元格：有内容时微软雅黑加粗，否则微软雅黑常规。
+    """
+    cell = WriteOnlyCell(worksheet, value=value)
+    cell.font = bold_font if value else normal_font
+    return cell
+
+
+def find_citation_groups(labels):
+    """
+    根据 A 列找出每个被引文献占用的行范围 [(起始行, 结束行), ...]（从 0 开始，含结束行）：
+    A 列有值的行开始一个被引文献，其后 A 列为空的续行属于同一被引文献。
+    """
+    groups = []
+    start_row = 0
+    while start_row < len(labels):
+        if labels[start_row]:
             end_row = start_row
-            while end_row + 1 <= max_row and ws.cell(row=end_row + 1, column=1).value is None:
+            while end_row + 1 < len(labels) and labels[end_row + 1] is None:
                 end_row += 1
-            ws.merge_cells(start_row=start_row, start_column=1, end_row=end_row, end_column=1)
-            merged_ranges.append((start_row, end_row))
+            groups.append((start_row, end_row))
             start_row = end_row + 1
         else:
             start_row += 1
+    return groups
+
+
+def select_citation_columns(rows):
+    """
+    将按行存放的值转为按列存放，并删除 D、G、I、J 列；较短的行用 None 补齐。
+    """
+    width = max((len(row) for row in rows), default=0)
+    kept_columns = [col for col in range(width) if col + 1 not in COLUMNS_TO_DELETE]
+    return [[row[col] if col < len(row) else None for row in rows] for col in kept_columns]
+
 
-    # Function to concatenate cell values with newline characters
-    def concatenate_values(start_row, end_row, col):
-        values = []
-        for row in range(start_row, end_row + 1):
-            cell_value = ws.cell(row=row, column=col).value
-            if cell_value:
-                values.append(cell_value)
-        return "\n".join(values)
+def transform_citation_columns(columns):
+    """
+    对按列存放的引用格式表（已删除 D、G、I、J 列）：B 列只保留第一个分号之前的内容，B~F 列空单元格填“/”，
+    并把每个被引文献的续行按列用换行符合并到首行（续行置空）。返回 (columns, groups)。
+    """
+    col_count = len(columns)
+    groups = find_citation_groups(columns[0]) if columns else []
 
     # Process column B: Remove content after the first semicolon
-    for row in range(1, max_row + 1):
-        cell_value = ws.cell(row=row, column=2).value
-        if cell_value:
-            ws.cell(row=row, column=2).value = cell_value.split(';')[0].strip()
+    if col_count > 1:
+        columns[1] = [value.split(';')[0].strip() if value else value for value in columns[1]]
 
     # Replace empty cells in columns B, C, D, E, F with "/"
-    for col in range(2, col_count + 1):
-        if col in {2, 3, 4, 5, 6}:  # B, C, D, E, F columns
-            for row in range(1, max_row + 1):
-                cell_value = ws.cell(row=row, column=col).value
-                if cell_value is None or cell_value == "":
-                    ws.cell(row=row, column=col).value = '/'
+    for col in range(1, min(col_count, 6)):
+        columns[col] = ['/' if value is None or value == "" else value for value in columns[col]]
+
+    # 按被引文献分组，用换行符连接各列的续行内容
+    for column in columns:
+        for start_row, end_row in groups:
+            column[start_row] = "\n".join(value for value in column[start_row:end_row + 1] if value)
+            for row in range(start_row + 1, end_row + 1):
+                column[row] = None
+
+    return columns, groups
+
+
+def citation_for_word_frame(citation_rows):
+    """
+    由内存中的引用格式行直接得到与读取 citation_for_word.xlsx（header=None）相同的 DataFrame，
+    空字符串与写入 Excel 后一样视为空值。
+    """
+    rows = [[value if value != "" else None for value in row] for row in citation_rows]
+    columns, _ = transform_citation_columns(select_citation_columns(rows))
+    citation_for_word_df = pd.DataFrame({col: column for col, column in enumerate(columns)})
+    return citation_for_word_df.mask(citation_for_word_df.eq(''))
+
+
+def process_xlsx(input_file_path, output_file_path):
+    """
+    删除 D、G、I、J 列，B 列只保留第一个分号之前的内容，B~F 列空单元格填“/”，
+    并把每个被引文献的续行按列用换行符合并到首行、合并单元格，最后一次写出。
+    """
+    source_wb = load_workbook(input_file_path, read_only=True)
+    source_ws = source_wb.active
+    source_rows = [list(row) for row in source_ws.iter_rows()]
+    sheet_title = source_ws.title
+    source_wb.close()
+
+    # 按列存放源单元格（用于复制样式）和单元格值
+    source_cells = select_citation_columns(source_rows)
+    columns = [[cell.value if cell is not None else None for cell in column] for column in source_cells]
+    row_count = len(source_rows)
+    col_count = len(columns)
+
+    columns, groups = transform_citation_columns(columns)
+
+    wb = Workbook()
+    ws = wb.active
+    ws.title = sheet_title
+
+    for row in range(row_count):
+        new_row = []
+        for col in range(col_count):
+            new_cell = Cell(ws, value=columns[col][row])
+            source_cell = source_cells[col][row]
+            if getattr(source_cell, 'has_style', False):
+                new_cell.font = copy(source_cell.font)
+                new_cell.border = copy(source_cell.border)
+                new_cell.fill = copy(source_cell.fill)
+                new_cell.number_format = source_cell.number_format
+                new_cell.protection = copy(source_cell.protection)
+                new_cell.alignment = copy(source_cell.alignment)
+            new_row.append(new_cell)
+        ws.append(new_row)
 
     # Merge cells based on column A merged ranges
     for col in range(1, col_count + 1):
-        for start_row, end_row in merged_ranges:
-            merged_value = concatenate_values(start_row, end_row, col)
-            ws.cell(row=start_row, column=col).value = merged_value
-            ws.merge_cells(start_row=start_row, start_column=col, end_row=end_row, end_column=col)
+        for start_row, end_row in groups:
+            ws.merge_cells(start_row=start_row + 1, start_column=col, end_row=end_row + 1, end_column=col)
 
     # Save the processed file
     wb.save(output_file_path)
 
 
-# Use the functions to process files
-txt_file_path = 'C:/Users/Lenovo/pythonProject/examples/张健示例/SCI-E引用数据/SCI-E引用格式.txt'
-xlsx_file_path = 'C:/Users/Lenovo/pythonProject/data_output/citation_output.xlsx'
-convert_txt_to_xlsx(txt_file_path, xlsx_file_path)
+def main():
+    # Use the functions to process files
+    txt_file_path = 'C:/Users/Lenovo/pythonProject/examples/张健示例/SCI-E引用数据/SCI-E引用格式.txt'
+    xlsx_file_path = 'C:/Users/Lenovo/pythonProject/data_output/citation_output.xlsx'
+    convert_txt_to_xlsx(txt_file_path, xlsx_file_path)
+
+    output_file_path = 'C:/Users/Lenovo/pythonProject/data_output/citation_for_word.xlsx'
+    process_xlsx(xlsx_file_path, output_file_path)
+
+    print("Data has been processed and saved.")
+
 
-output_file_path = 'C:/Users/Lenovo/pythonProject/data_output/citation_for_word.xlsx'
-process_xlsx(xlsx_file_path, output_file_path)
+if __name__ == "__main__":
+    main()
 
-print("Data has been processed and saved.")
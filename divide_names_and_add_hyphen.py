@@ -1,7 +1,168 @@
-# 韵母和声母定义
-compound_vowels = ["uang", "iang", "uai", "uan", "uei", "ang", "eng", "ing", "ong", "iao", "iou", "ai", "ei", "ui", "ao", "ou", "iu", "ie", "ve", "an", "en", "in", "un", "er", "ia", "ua", "uo", "ue"]
-single_vowels = ["a", "o", "i", "e", "u", "v"]
-consonants = ["zh", "ch", "sh", "b", "p", "m", "f", "d", "t", "n", "l", "g", "k", "h", "j", "q", "x", "z", "c", "s", "r", "y", "w"]
+import sys
+import heapq
+from itertools import islice
+from functools import lru_cache
+import pandas as pd
+
+# 作者姓名缓存的最大条目数，批量处理时只保留最近用到的姓名
+NAME_CACHE_SIZE = 100000
+
+# 完整的汉语拼音音节表（ü 记为 v），按声母分组
+PINYIN_SYLLABLES = """
+a ai an ang ao e ei en eng er o ou
+ba bai ban bang bao bei ben beng bi bian biao bie bin bing bo bu
+pa pai pan pang pao pei pen peng pi pian piao pie pin ping po pou pu
+ma mai man mang mao me mei men meng mi mian miao mie min ming miu mo mou mu
+fa fan fang fei fen feng fo fou fu
+da dai dan dang dao de dei den deng di dia dian diao die ding diu dong dou du duan dui dun duo
+ta tai tan tang tao te tei teng ti tian tiao tie ting tong tou tu tuan tui tun tuo
+na nai nan nang nao ne nei nen neng ni nian niang niao nie nin ning niu nong nou nu nuan nun nuo nv nve
+la lai lan lang lao le lei leng li lia lian liang liao lie lin ling liu lo long lou lu luan lun luo lv lve
+ga gai gan gang gao ge gei gen geng gong gou gu gua guai guan guang gui gun guo
+ka kai kan kang kao ke kei ken keng kong kou ku kua kuai kuan kuang kui kun kuo
+ha hai han hang hao he hei hen heng hong hou hu hua huai huan huang hui hun huo
+ji jia jian jiang jiao jie jin jing jiong jiu ju juan jue jun
+qi qia qian qiang qiao qie qin qing qiong qiu qu quan que qun
+xi xia xian xiang xiao xie xin xing xiong xiu xu xuan xue xun
+zha zhai zhan zhang zhao zhe zhei zhen zheng zhi zhong zhou zhu zhua zhuai zhuan zhuang zhui zhun zhuo
+cha chai chan chang chao che chen cheng chi chong chou chu chua chuai chuan chuang chui chun chuo
+sha shai shan shang shao she shei shen sheng shi shou shu shua shuai shuan shuang shui shun shuo
+ran rang rao re ren reng ri rong rou ru rua ruan rui run ruo
+za zai zan zang zao ze zei zen zeng zi zong zou zu zuan zui zun zuo
+ca cai can cang cao ce cen ceng ci cong cou cu cuan cui cun cuo
+sa sai san sang sao se sen seng si song sou su suan sui sun suo
+ya yan yang yao ye yi yin ying yo yong you yu yuan yue yun
+wa wai wan wang wei wen weng wo wu
+""".split()
+
+# segment_pinyin 默认最多列出的切分数（按排序取最优的前若干种），切分总数随名的长度指数增长
+SEGMENTATION_LIMIT = 1000
+
+# 零声母（a、o、e 开头）的音节，出现在名的中间时容易与前一个音节粘连（如 Yanan 应为 Ya-nan 而非 Yan-an）
+ZERO_INITIALS = ('a', 'o', 'e')
+
+# 音节切分无法判断、需要固定写法的名
+special_cases = {
+    "dean": "de-an",
+    "aoer": "ao-er",
+    "anan": "an-an",
+    "jiaer": "jia-er",
+    "jiaan": "jia-an",
+    "aiai": "ai-ai",
+    "erer": "er-er"
+}
+
+
+def build_syllable_trie(syllables):
+    """
+    把音节表编译为字典树：每个节点是 {字母: 子节点}，节点中含 '$' 键表示到此为一个完整音节。
+    """
+    trie = {}
+    for syllable in syllables:
+        node = trie
+        for char in syllable:
+            node = node.setdefault(char, {})
+        node['$'] = True
+    return trie
+
+
+PINYIN_TRIE = build_syllable_trie(PINYIN_SYLLABLES)
+
+
+def syllable_ends(text, start):
+    """
+    从 start 出发沿字典树走一遍，返回 text[start:end] 为完整音节的全部 end。
+    """
+    ends = []
+    node = PINYIN_TRIE
+    for end in range(start, len(text)):
+        node = node.get(text[end])
+        if node is None:
+            break
+        if '$' in node:
+            ends.append(end + 1)
+    return ends
+
+
+def segmentation_rank(syllables):
+    """
+    切分结果的排序键：音节数越少越好；其次名中间的零声母音节越少越好；再次前面的音节越长越好。
+    """
+    zero_initials = sum(syllable.startswith(ZERO_INITIALS) for syllable in syllables[1:])
+    return len(syllables), zero_initials, [-len(syllable) for syllable in syllables]
+
+
+def best_segmentation(text):
+    """
+    用动态规划求一个不含分隔符的拼音名按 segmentation_rank 最优的音节切分（音节列表），不能完整切分时返回空列表。
+    从右到左为每个位置只保留 text[i:] 的最优切分：同一位置的候选首字母相同，零声母计数的差别只来自后面的音节，
+    因此逐位取最优即得整体最优。每个位置最多有 6 个候选（音节最长 6 个字母），不列举全部切分。
+    """
+    text = text.lower()
+    # tails[i] 为 text[i:] 的最优切分，None 表示无法切分
+    tails = [None] * len(text) + [[]]
+    for start in range(len(text) - 1, -1, -1):
+        tails[start] = min(([text[start:end]] + tails[end] for end in syllable_ends(text, start)
+                            if tails[end] is not None), key=segmentation_rank, default=None)
+    return tails[0] or []
+
+
+def segment_pinyin(text, limit=SEGMENTATION_LIMIT):
+    """
+    按 segmentation_rank 从优到劣依次生成一个不含分隔符的拼音名的合法切分（每种为音节列表），
+    只生成最优的前 limit 种（limit=None 时生成全部，切分总数随名的长度指数增长）；不能完整切分时不生成任何切分。
+    按优先顺序逐个生成：text[i:] 的有序切分由各个首音节接上 text[end:] 的有序切分归并而成（同一位置的候选首字母相同，
+    接上同一首音节不改变先后顺序），每个位置已生成的切分缓存起来供多处共用。第一种即 best_segmentation 的结果。
+    """
+    text = text.lower()
+    # buffers[i] 为 (text[i:] 已生成的有序切分, 继续生成的归并迭代器)
+    buffers = {}
+
+    def ranked_tails(start):
+        if start == len(text):
+            yield []
+            return
+        if start not in buffers:
+            buffers[start] = ([], heapq.merge(*(prefixed_tails(start, end) for end in syllable_ends(text, start)),
+                                              key=segmentation_rank))
+        produced, source = buffers[start]
+        position = 0
+        while True:
+            if position == len(produced):
+                tail = next(source, None)
+                if tail is None:
+                    return
+                produced.append(tail)
+            yield produced[position]
+            position += 1
+
+    def prefixed_tails(start, end):
+        syllable = text[start:end]
+        for tail in ranked_tails(end):
+            yield [syllable] + tail
+
+    return islice(ranked_tails(0), limit)
+
+
+def hyphenate_given_name(names):
+    """
+    按最优切分在名的音节之间加短横线，保留原有大小写；特殊写法优先，无法切分（非拼音）时原样返回。
+    """
+    names_lower = names.lower()
+    if names_lower in special_cases:
+        return special_cases[names_lower]
+
+    syllables = best_segmentation(names)
+    if not syllables:
+        return names
+
+    pieces = []
+    position = 0
+    for syllable in syllables:
+        pieces.append(names[position:position + len(syllable)])
+        position += len(syllable)
+    return '-'.join(pieces)
+
 
 def add_hyphen_to_pinyin(pinyin_name):
     # 处理姓和名的不同连接方式
@@ -27,98 +188,82 @@ def add_hyphen_to_pinyin(pinyin_name):
         else:
             return pinyin_name  # 如果分隔符处理失败，则返回原始字符串
 
-    # 处理名中的多个空格（第二个空格及之后的空格替换为短横线）
-    if ' ' in names:
-        split_names = names.split()
-        if len(split_names) > 1:
-            names = split_names[0] + '-' + '-'.join(split_names[1:])
-
-    # 特殊处理规则
-    special_cases = {
-        "dean": "de-an",
-        "aoer": "ao-er",
-        "anan": "an-an",
-        "jiaer": "jia-er",
-        "jiaan": "jia-an",
-        "aiai": "ai-ai",
-        "erer": "er-er"
-    }
-
-    # 如果名符合特殊处理规则，直接返回处理后的结果
-    names_lower = names.lower()
-    if names_lower in special_cases:
-        return f"{last_name}, {special_cases[names_lower].capitalize()}"
-
-    # 检查名是否仅由一个声母和一个（复合）韵母组成
-    for cons in consonants:
-        for vowel in compound_vowels + single_vowels:
-            if names.lower() == cons + vowel:
-                return f"{last_name}, {names.capitalize()}"
-
-    # 检查名中是否存在重复的声母和韵母组合
-    for cons in consonants:
-        for vowel in compound_vowels + single_vowels:
-            combo = cons + vowel
-            if names.lower().count(combo) > 1:
-                # 找到第二个出现的组合位置
-                second_occurrence = names.lower().find(combo, names.lower().find(combo) + 1)
-                # 在第二个组合的前面插入短横线
-                names = names[:second_occurrence] + '-' + names[second_occurrence:]
-                return f"{last_name}, {names.capitalize()}"
-
-    # 从右到左检查名的部分，寻找可以加短横线的位置
-    length = len(names)
-    i = length
-    while i > 0:
-        # 先匹配复合韵母，按照最长的匹配
-        for vowel in compound_vowels:
-            if i >= len(vowel) and names.lower()[i-len(vowel):i] == vowel:
-                # 检查复合韵母左边的字符
-                if i - len(vowel) - 1 >= 0:
-                    prev_char = names[i-len(vowel)-1]
-                    if prev_char not in [',', ' '] and prev_char not in consonants:
-                        # 添加短横线的左边不能是空格或逗号
-                        if i - len(vowel) - 1 >= 0 and names[i-len(vowel)-1] not in [',', ' ']:
-                            names = names[:i-len(vowel)] + '-' + names[i-len(vowel):]
-                            return f"{last_name}, {names.capitalize()}"
-                # 增加额外的检查规则：an、ao、er 的左边不是空格、逗号或任何声母
-                elif vowel in ['an', 'ao', 'er'] and i - len(vowel) > 0:
-                    prev_char = names[i-len(vowel)-1]
-                    if prev_char not in [',', ' '] and prev_char not in consonants:
-                        # 添加短横线的左边不能是空格或逗号
-                        if i - len(vowel) - 1 >= 0 and names[i-len(vowel)-1] not in [',', ' ']:
-                            names = names[:i-len(vowel)] + '-' + names[i-len(vowel):]
-                            return f"{last_name}, {names.capitalize()}"
-        # 如果最右边不是复合韵母，则检查单个韵母
-        if names[i-1] in single_vowels and i - 2 >= 0 and names[i-2] in consonants:
-            if i - 3 < 0 or names[i-3] not in [",", " "]:
-                names = names[:i-2] + '-' + names[i-2:]
-                return f"{last_name}, {names.capitalize()}"
-        i -= 1
+    # 名中已有空格或短横线时，按原有分隔连接为短横线，不再切分
+    split_names = names.replace('-', ' ').split()
+    if len(split_names) > 1:
+        names = '-'.join(split_names)
+    else:
+        names = hyphenate_given_name(names)
 
     return f"{last_name}, {names.capitalize()}"
 
-# 示例
-pinyin_names = [
-    "Zhang huan",       # 名中有两个不连续的空格，返回 "Zhang-Huan"
-    "Chen, jin",        # 不符合特殊处理规则
-    "Li, Changhong",    # 不符合特殊处理规则
-    "Wang, Yiming",     # 不符合特殊处理规则
-    "Guo, Dean",        # 符合特殊处理规则，返回 "Guo, De-an"
-    "He, Ai",           # 不符合特殊处理规则
-    "Zhao, shuai",      # 不符合特殊处理规则
-    "Wu, lilai",        # 不符合特殊处理规则
-    "Li  Zhenan",       # 名中有两个不连续的空格，返回 "Li-Zhenan"
-    "Wu  Ao",           # 名中有两个不连续的空格，返回 "Wu-Ao"
-    "Li  minjia",         # 名中有两个不连续的空格，返回 "Li-Xuer"
-    "Wang Yiming",      # 名中有一个空格，返回 "Wang-Yiming"
-    "Li  Jia",          # 名中有两个空格，返回 "Li-Jia"
-    "Zheng huangying",   # 名中有两个不连续的空格，返回 "Zheng, Ming-yue"
-    "Zheng dean" # 姓 名1 名2，返回 "Zheng, Ming-yue-Zhong"
-]
-
-# 应用规则并输出结果
-split_pinyin_names = [add_hyphen_to_pinyin(name) for name in pinyin_names]
-
-for original, split in zip(pinyin_names, split_pinyin_names):
-    print(f"Original: {original} -> Split: {split}")
+
+@lru_cache(maxsize=NAME_CACHE_SIZE)
+def cached_add_hyphen_to_pinyin(pinyin_name):
+    return add_hyphen_to_pinyin(pinyin_name)
+
+
+def hyphenate_author_names(cells):
+    """
+    批量处理作者列：cells 为 pandas Series 或由 '; ' 分隔的作者字符串组成的可迭代对象。
+    所有单元格只拆分一次，只对不重复的姓名调用 add_hyphen_to_pinyin（经有界缓存），
+    再按原单元格用 '; ' 重新连接，返回与输入索引相同的 Series；Series 的空单元格保持原值，其他可迭代对象的空单元格为 None。
+    拆分和重新连接都按位置进行，输入索引有重复（如 pd.concat 合并的导出表）时各行也不会互相串行。
+    """
+    is_series = isinstance(cells, pd.Series)
+    original_index = cells.index if is_series else None
+    cells = (cells if is_series else pd.Series(list(cells), dtype=object)).reset_index(drop=True)
+    names = cells.dropna().astype(str).str.split('; ').explode().str.strip()
+
+    distinct = names.unique()
+    hyphenated = names.map(dict(zip(distinct, map(cached_add_hyphen_to_pinyin, distinct)))).astype(object)
+
+    joined = (hyphenated + '; ').groupby(level=0, sort=False).sum().str[:-2]
+    result = joined.reindex(cells.index).astype(object)
+    if not is_series:
+        return result.where(cells.notna(), None)
+    result = result.where(cells.notna(), cells)
+    result.index = original_index
+    return result
+
+
+def hyphenate_author_file(input_file, output_file, column_name='Author Full Names'):
+    """
+    读取 SCI-E 或 savedrecs 导出表，为 column_name 列中的全部作者名加短横线后另存。
+    """
+    df = pd.read_excel(input_file)
+    df[column_name] = hyphenate_author_names(df[column_name])
+    df.to_excel(output_file, index=False)
+    print(f"{len(df)} 条记录的作者名已处理，保存到 {output_file}")
+
+
+if __name__ == "__main__":
+    # 处理整个导出表，例如 python divide_names_and_add_hyphen.py savedrecs.xls 输出.xlsx [列名]
+    if len(sys.argv) >= 3:
+        hyphenate_author_file(*sys.argv[1:4])
+        sys.exit()
+
+    # 示例
+    pinyin_names = [
+        "Zhang huan",       # 名中有两个不连续的空格，返回 "Zhang-Huan"
+        "Chen, jin",        # 不符合特殊处理规则
+        "Li, Changhong",    # 不符合特殊处理规则
+        "Wang, Yiming",     # 不符合特殊处理规则
+        "Guo, Dean",        # 符合特殊处理规则，返回 "Guo, De-an"
+        "He, Ai",           # 不符合特殊处理规则
+        "Zhao, shuai",      # 不符合特殊处理规则
+        "Wu, lilai",        # 不符合特殊处理规则
+        "Li  Zhenan",       # 名中有两个不连续的空格，返回 "Li-Zhenan"
+        "Wu  Ao",           # 名中有两个不连续的空格，返回 "Wu-Ao"
+        "Li  minjia",         # 名中有两个不连续的空格，返回 "Li-Xuer"
+        "Wang Yiming",      # 名中有一个空格，返回 "Wang-Yiming"
+        "Li  Jia",          # 名中有两个空格，返回 "Li-Jia"
+        "Zheng huangying",   # 名中有两个不连续的空格，返回 "Zheng, Ming-yue"
+        "Zheng dean" # 姓 名1 名2，返回 "Zheng, Ming-yue-Zhong"
+    ]
+
+    # 应用规则并输出结果
+    split_pinyin_names = [add_hyphen_to_pinyin(name) for name in pinyin_names]
+
+    for original, split in zip(pinyin_names, split_pinyin_names):
+        print(f"Original: {original} -> Split: {split}")
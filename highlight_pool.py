@@ -0,0 +1,64 @@
+import os
+import time
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from citation_sidecar import sidecar_path
+
+# 工作进程各自的临时目录，由 init_worker 在进程启动时创建
+worker_temp_dir = None
+
+
+def init_worker(temp_root):
+    global worker_temp_dir
+    worker_temp_dir = tempfile.mkdtemp(prefix=f'worker_{os.getpid()}_', dir=temp_root)
+
+
+def run_highlight_job(func, input_file, output_file, args):
+    """
+    在工作进程中运行一个高亮任务：先把高亮文件和自引统计写到本进程的临时目录，完成后再移动到输出位置，
+    其他进程不会读到写了一半的文件。返回 func 的返回值。
+    """
+    temp_output = os.path.join(worker_temp_dir, os.path.basename(output_file))
+    result = func(input_file, temp_output, *args)
+    os.replace(temp_output, output_file)
+    if os.path.exists(sidecar_path(temp_output)):
+        os.replace(sidecar_path(temp_output), sidecar_path(output_file))
+    return result
+
+
+def print_progress(label, done, total, start_time):
+    seconds = time.perf_counter() - start_time
+    rate = done / seconds if seconds > 0 else 0
+    print(f"\r{label}: {done}/{total} 个文件，{seconds:.1f} 秒，{rate:.1f} 个/秒", end='', flush=True)
+
+
+def run_highlight_jobs(jobs, workers=None, label='自引高亮'):
+    """
+    运行一组高亮任务 [(func, input_file, output_file, args), ...]，即 func(input_file, output_file, *args)。
+    workers 大于 1 时分发到进程池，每个工作进程在输出目录下使用独立的临时目录；运行过程中显示进度和吞吐量。
+    返回值按任务顺序排列，与完成先后无关，合计结果因此是确定的。
+    """
+    results = [None] * len(jobs)
+    if not jobs:
+        return results
+
+    start_time = time.perf_counter()
+    if not workers or workers <= 1:
+        for position, (func, input_file, output_file, args) in enumerate(jobs):
+            results[position] = func(input_file, output_file, *args)
+            print_progress(label, position + 1, len(jobs), start_time)
+        print()
+        return results
+
+    temp_root = tempfile.mkdtemp(prefix='.highlight_', dir=os.path.dirname(os.path.abspath(jobs[0][2])))
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(temp_root,)) as executor:
+            futures = {executor.submit(run_highlight_job, *job): position for position, job in enumerate(jobs)}
+            for done, future in enumerate(as_completed(futures), 1):
+                results[futures[future]] = future.result()
+                print_progress(label, done, len(jobs), start_time)
+        print()
+    finally:
+        shutil.rmtree(temp_root, ignore_errors=True)
+    return results
@@ -1,170 +1,114 @@
 import re
 import os
-import pandas as pd
 from pypinyin import lazy_pinyin, Style
-from openpyxl import load_workbook, Workbook
-from openpyxl.styles import PatternFill
-from copy import copy
+from citation_sidecar import write_sidecar
+from highlight_writer import read_savedrecs, write_highlighted_xlsx
+from highlight_pool import run_highlight_jobs
 
+# 匹配键中姓和名之间的分隔符
+AUTHOR_KEY_SEPARATOR = '|'
 
-def expand_pinyin_variants(surname, given_name):
+
+def author_key(name):
+    """
+    把作者姓名化为唯一的匹配键 '姓|名'：有逗号时在第一个逗号处分开姓和名，没有逗号时在第一个空格处分开，
+    只去掉姓和名各自内部的短横线和空格，统一大小写。例如 'Zhang, Jian'、'Zhang Jian'、'zhang, Ji-an'
+    都化为 'zhang|jian'，而 'Li, Nan' 和 'Lin, An' 分别为 'li|nan' 和 'lin|an'；已是匹配键的保持不变
+    """
+    name = str(name).strip()
+    for separator in (',', AUTHOR_KEY_SEPARATOR, ' '):
+        if separator in name:
+            break
+    surname, _, given_name = name.partition(separator)
+    parts = [re.sub(r'[-\s]', '', part) for part in (surname, given_name)]
+    return AUTHOR_KEY_SEPARATOR.join(parts).casefold()
+
+
+def author_keys(names):
     """
-    扩展手动输入的拼音形式，生成各种拼音表示形式，包括大写和小写组合
+    author_key 的向量化版本，names 为 pandas Series
     """
-    surname = surname.capitalize().strip()
-    given_name = given_name.replace(' ', '').replace('-', '').capitalize().strip()
-
-    variants = [
-        f"{surname} {given_name}",
-        f"{surname} {given_name.lower()}",
-        f"{surname} {given_name.capitalize()}",
-        f"{surname}-{given_name.capitalize()}",
-        f"{surname}-{given_name.lower()}",
-        f"{surname}, {given_name}",
-        f"{surname}, {given_name.lower()}",
-        f"{surname}, {given_name.capitalize()}",
-        f"{surname}, {given_name}",
-        f"{surname} {given_name[0].upper() + given_name[1:].lower()}",
-        f"{surname} {given_name.lower()}",
-        f"{surname} {given_name[0].lower() + given_name[1:].capitalize()}",
-        f"{surname}{given_name.lower()}",
-        f"{surname}{given_name.capitalize()}",
-        f"{surname}-{given_name}",
-        f"{surname}-{given_name.lower()}",
-        f"{surname}-{given_name.capitalize()}"
-    ]
-
-    return variants
-
-
-def generate_pinyin_variants(chinese_name):
+    names = names.astype(str).str.strip()
+    parts = names.where(names.str.contains(',', regex=False),
+                        names.str.replace(r'\s', ',', n=1, regex=True)).str.partition(',')
+    return (parts[0].str.replace(r'[-\s]', '', regex=True) + AUTHOR_KEY_SEPARATOR +
+            parts[2].str.replace(r'[-\s]', '', regex=True)).str.casefold()
+
+
+def generate_pinyin_key(chinese_name):
     """
-    将中文姓名转换为多种拼音表示形式，包括大写和小写组合
+    将中文姓名转换为拼音匹配键
     """
     pinyin_name = lazy_pinyin(chinese_name, style=Style.NORMAL, strict=False)
     if len(pinyin_name) < 2:
         raise ValueError("输入的中文姓名格式不正确，请确保有姓氏和名字。")
 
-    surname = pinyin_name[0].capitalize()
-    given_name = ''.join(pinyin_name[1:])
-    given_name_hyphenated = '-'.join(pinyin_name[1:])
-
-    variants = [
-        f"{surname} {given_name}",
-        f"{surname} {given_name.lower()}",
-        f"{surname} {given_name.capitalize()}",
-        f"{surname}-{given_name.capitalize()}",
-        f"{surname}-{given_name.lower()}",
-        f"{surname}, {given_name}",
-        f"{surname}, {given_name.lower()}",
-        f"{surname}, {given_name.capitalize()}",
-        f"{surname}, {given_name}",
-        f"{surname} {given_name[0].upper() + given_name[1:].lower()}",
-        f"{surname} {given_name.lower()}",
-        f"{surname} {given_name[0].lower() + given_name[1:].capitalize()}",
-        f"{surname}{given_name.lower()}",
-        f"{surname}{given_name.capitalize()}",
-        f"{surname}-{given_name}",
-        f"{surname}-{given_name.lower()}",
-        f"{surname}-{given_name.capitalize()}"
-    ]
-
-    return variants
-
-
-def normalize_name(name):
-    """
-    Normalize name formats to a consistent representation
-    """
-    # Remove any hyphens and spaces in names
-    name = name.replace(' ', '').replace('-', '')
-    return name
+    return author_key(f"{pinyin_name[0]}, {''.join(pinyin_name[1:])}")
 
 
 def parse_manual_pinyin(pinyin_inputs):
     """
-    解析手动输入的拼音格式，并生成各种拼音表示形式
+    解析手动输入的拼音格式（多个作者用 ';' 分隔），第一部分为姓，其余部分连接为名，返回各作者的匹配键
     """
-    names = []
+    names = set()
     for pinyin_input in pinyin_inputs.split(';'):
         parts = re.split(r'[, ]+', pinyin_input.strip())
         if len(parts) >= 2:
-            surname = parts[0].strip()
-            given_name = ''.join(parts[1:]).strip()
-            normalized_given_name = normalize_name(given_name)
-            variants = expand_pinyin_variants(surname, normalized_given_name)
-            names.extend(variants)
+            names.add(author_key(f"{parts[0]}, {''.join(parts[1:])}"))
     return names
 
 
+def self_citation_flags(authors, names):
+    """
+    authors 为作者列（'; ' 分隔的作者姓名），names 为自引作者的姓名或匹配键；
+    整列拆分展开后一次 isin 匹配，返回每行是否含有自引作者（1/0）的列表
+    """
+    targets = {author_key(name) for name in names}
+    keys = author_keys(authors.fillna('').astype(str).str.split(';').explode())
+    return keys.isin(targets).groupby(level=0).any().astype(int).tolist()
+
+
 def highlight_name(input_file, output_file, column_name, names):
-    # 读取 .xls 文件并转换为 .xlsx 文件
-    intermediate_file = 'intermediate.xlsx'
-
-    # 使用 pandas 读取 .xls 文件
-    df = pd.read_excel(input_file, engine='xlrd')
-
-    # 将数据保存为 .xlsx 文件
-    df.to_excel(intermediate_file, index=False)
-
-    # 使用 openpyxl 加载 .xlsx 文件
-    wb = load_workbook(intermediate_file)
-    ws = wb.active
-
-    # 设置黄色填充
-    yellow_fill = PatternFill(start_color="FFFF00", end_color="FFFF00", fill_type="solid")
-
-    # 获取指定列的索引
-    col_idx = df.columns.get_loc(column_name) + 1
-    author_col_idx = df.columns.get_loc('Authors') + 1  # 获取'Authors'列的索引
-
-    # 统计总数据条数和未被高亮的数据条数
-    total_count = 0
-    non_highlight_count = 0
-
-    # 遍历指定列，查找包含搜索字符串的单元格并设置高亮
-    for row in ws.iter_rows(min_row=2, max_row=ws.max_row, min_col=1, max_col=ws.max_column):
-        cell = row[col_idx - 1]  # 列的索引从0开始，因此需要减去1
-        author_cell = row[author_col_idx - 1]  # 同上
-
-        total_count += 1
-        cell_values = [value.strip() for value in str(cell.value).split(';')]
-        flag = 0
-        for name in names:
-            if name in cell_values:
-                cell.fill = yellow_fill
-                author_cell.fill = yellow_fill  # 同时高亮'Authors'字段的单元格
-                flag = 1
-                break
-        if flag == 0:
-            non_highlight_count += 1
-
-    # 保存修改后的 Excel 文件
-    wb.save(output_file)
+    """
+    读取一次 .xls 文件，整列匹配自引作者，并直接写出高亮的 .xlsx 文件（同时高亮'Authors'列）
+    """
+    df = read_savedrecs(input_file)
 
-    return total_count, non_highlight_count
+    # 整列一次匹配自引作者
+    flags = self_citation_flags(df[column_name].reset_index(drop=True), names)
+
+    # 流式写出高亮文件
+    write_highlighted_xlsx(df, output_file, flags, [column_name, 'Authors'])
 
+    total_count = len(flags)
+    non_highlight_count = total_count - sum(flags)
 
-def highlight_name_batch(input_folder, output_folder, column_name, names):
-    total_count_sum = 0
-    non_highlight_count_sum = 0
+    # 写入自引统计，后续统计时无需重新解析高亮文件
+    write_sidecar(output_file, flags, input_file)
 
+    return total_count, non_highlight_count
+
+
+def highlight_name_batch(input_folder, output_folder, column_name, names, workers=None):
+    """
+    高亮文件夹中的全部 .xls 文件；workers 大于 1 时用进程池并行处理，合计结果与处理顺序无关
+    """
     # 确保输出文件夹存在
     if not os.path.exists(output_folder):
         os.makedirs(output_folder)
 
     # 遍历文件夹中的所有 .xls 文件
-    for filename in os.listdir(input_folder):
+    jobs = []
+    for filename in sorted(os.listdir(input_folder)):
         if filename.endswith('.xls'):
             input_file = os.path.join(input_folder, filename)
             output_file = os.path.join(output_folder, filename.replace('.xls', '_highlighted.xlsx'))
+            jobs.append((highlight_name, input_file, output_file, (column_name, names)))
 
-            # 调用 highlight_name 函数处理文件
-            total_count, non_highlight_count = highlight_name(input_file, output_file, column_name, names)
-
-            # 累加统计结果
-            total_count_sum += total_count
-            non_highlight_count_sum += non_highlight_count
+    # 调用 highlight_name 函数处理文件，并累加统计结果
+    results = run_highlight_jobs(jobs, workers)
+    total_count_sum = sum(total_count for total_count, _ in results)
+    non_highlight_count_sum = sum(non_highlight_count for _, non_highlight_count in results)
 
     print(f"总数据条数（总引）: {total_count_sum}")
     print(f"未被高亮的数据条数（他引）: {non_highlight_count_sum}")
@@ -183,22 +127,22 @@ if __name__ == '__main__':
     if mode == 'manual':
         pinyin_inputs = input(
             "请输入拼音形式：\n（1-姓在前，名在后，全拼；2-姓和名之间可用空格或逗号,连接，请保持一致；3-名有两个汉字的，两个汉字拼音之间用空格或-连接），用';'分隔多个作者的姓名: ").strip()
-        # 解析手动输入的拼音形式
+        # 解析手动输入的拼音形式，得到各作者的匹配键
         names = parse_manual_pinyin(pinyin_inputs)
 
 
     elif mode == 'auto':
         chinese_names = input("请输入中文姓名（多个姓名用逗号、空格、分号或顿号隔开）: ")
-        names = []
+        names = set()
         for chinese_name in re.split(r'[，、；; ]', chinese_names):
             chinese_name = chinese_name.strip()
             if chinese_name:
-                names.extend(generate_pinyin_variants(chinese_name))
+                names.add(generate_pinyin_key(chinese_name))
 
     else:
         print("无效的选择，请输入 'manual' 或 'auto'")
         exit(1)
 
-    # 批量处理高亮
-    highlight_name_batch(input_folder, output_folder, column_name, names)
+    # 批量处理高亮，并行进程数默认使用全部 CPU 核心
+    highlight_name_batch(input_folder, output_folder, column_name, names, os.cpu_count())
     print("处理完成。")
\ No newline at end of file
@@ -0,0 +1,45 @@
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import PatternFill
+
+# 自引记录的黄色填充
+YELLOW_FILL = PatternFill(start_color="FFFF00", end_color="FFFF00", fill_type="solid")
+
+
+def read_savedrecs(input_file):
+    """
+    读取 savedrecs 导出表（.xls 或 .xlsx），只解析一次
+    """
+    return pd.read_excel(input_file)
+
+
+def excel_value(value):
+    """
+    把 DataFrame 中的值转换为可写入单元格的值：空值为空单元格，numpy 标量转为 Python 标量
+    """
+    if pd.isna(value):
+        return None
+    return value.item() if hasattr(value, 'item') else value
+
+
+def write_highlighted_xlsx(df, output_file, flags, highlight_columns):
+    """
+    以只写（流式）模式一次写出高亮文件：第一行为列名，flags 为真的行把 highlight_columns 中的单元格填充为黄色。
+    不再经过中间文件，多个进程可以同时写入同一目录。
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet('Sheet1')
+    highlight_positions = {df.columns.get_loc(column) for column in highlight_columns}
+
+    ws.append([str(column) for column in df.columns])
+    for values, flag in zip(df.itertuples(index=False, name=None), flags):
+        row = []
+        for position, value in enumerate(values):
+            cell = WriteOnlyCell(ws, value=excel_value(value))
+            if flag and position in highlight_positions:
+                cell.fill = YELLOW_FILL
+            row.append(cell)
+        ws.append(row)
+
+    wb.save(output_file)
@@ -0,0 +1,107 @@
+import os
+import sys
+import sqlite3
+import numpy as np
+import pandas as pd
+from stage_cache import file_digest
+from jif_index import MATCH_KEYS, add_journal_keys, jif_column, lookup_journals, match_journals
+
+# 历史库中保存的列；每个 JCR 版本按年份单独存为一张表（分区），例如 jif_2023
+HISTORY_COLUMNS = ['标准化期刊名', 'ISSN键', 'eISSN键', 'Journal name', 'Category', 'JIF', 'JIF Quartile']
+
+
+def edition_table(year):
+    return f'jif_{int(year)}'
+
+
+def read_editions(history_path):
+    """
+    返回历史库中已有的 JCR 版本 {年份: 源文件哈希}，历史库不存在时返回空字典。
+    """
+    if not os.path.exists(history_path):
+        return {}
+    with sqlite3.connect(f'file:{history_path}?mode=ro', uri=True) as conn:
+        try:
+            rows = conn.execute('SELECT year, source_digest FROM editions').fetchall()
+        except sqlite3.OperationalError:
+            rows = []
+    conn.close()
+    return dict(rows)
+
+
+def add_jif_edition(history_path, jif_path):
+    """
+    把一个 JCR 版本的期刊影响因子表写入历史库中对应年份的分区（已有同一年份时替换），
+    年份由影响因子列名（如 '2023 JIF'）识别；源文件内容已入库时跳过。返回该版本的年份。
+    """
+    digest = file_digest(jif_path)
+    for year, source_digest in read_editions(history_path).items():
+        if source_digest == digest:
+            print(f"JCR {year} 版本已在历史库中，跳过 {jif_path}")
+            return year
+
+    jif_df = add_journal_keys(pd.read_excel(jif_path), 'Journal name')
+    source_column, year = jif_column(jif_df.columns)
+    jif_df = jif_df.rename(columns={source_column: 'JIF'})
+    jif_df = jif_df[[column for column in HISTORY_COLUMNS if column in jif_df.columns]]
+
+    table = edition_table(year)
+    with sqlite3.connect(history_path) as conn:
+        conn.execute('CREATE TABLE IF NOT EXISTS editions (year INTEGER PRIMARY KEY, source_digest TEXT, source TEXT)')
+        jif_df.to_sql(table, conn, if_exists='replace', index=False)
+        for column, _ in MATCH_KEYS:
+            conn.execute(f'CREATE INDEX "idx_{table}_{column}" ON "{table}" ("{column}")')
+        conn.execute('INSERT OR REPLACE INTO editions VALUES (?, ?, ?)', (year, digest, os.path.basename(jif_path)))
+    conn.close()
+
+    print(f"JCR {year} 版本已写入历史库 {history_path}（{len(jif_df)} 行）")
+    return year
+
+
+def nearest_editions(years, editions):
+    """
+    为每个出版年份选择最接近的 JCR 版本年份（距离相同时取较早的版本），年份为空时取最新版本。
+    """
+    editions = np.array(sorted(editions))
+    values = pd.to_numeric(years, errors='coerce').to_numpy(dtype=float)
+    values = np.where(np.isnan(values), editions[-1], values)
+    nearest = np.abs(values[:, None] - editions[None, :]).argmin(axis=1)
+    return pd.Series(editions[nearest], index=years.index)
+
+
+def lookup_history(history_path, requests):
+    """
+    requests 为 (JCR年份, 期刊, ISSN键, eISSN键, 标准化期刊名) 的表，期刊 为调用方标识期刊的键。
+    只查询其中出现的年份分区，在每个分区中与 match_journals 一样按 ISSN、eISSN、标准化期刊名的顺序匹配，
+    期刊改名前的版本也能按 ISSN 查到。返回匹配到的期刊在对应版本中的全部记录（另含 JCR年份 和 期刊 列），
+    标准化期刊名 为该版本中的期刊名；历史库中没有的年份被忽略。
+    """
+    editions = read_editions(history_path)
+    frames = []
+    for year, journals in requests.groupby('JCR年份'):
+        if int(year) not in editions:
+            continue
+        table = edition_table(year)
+        matched = match_journals(journals.drop_duplicates('期刊'), history_path, table)
+        matched = matched.loc[matched['匹配期刊名'].notna(), ['期刊', '匹配期刊名']]
+        edition_df = lookup_journals(history_path, '标准化期刊名', matched['匹配期刊名'], table=table)
+        edition_df = pd.merge(matched, edition_df, left_on='匹配期刊名', right_on='标准化期刊名').drop(
+            columns='匹配期刊名')
+        edition_df.insert(0, 'JCR年份', int(year))
+        frames.append(edition_df)
+    if not frames:
+        return pd.DataFrame(columns=['JCR年份', '期刊'] + HISTORY_COLUMNS)
+    return pd.concat(frames, ignore_index=True)
+
+
+def main():
+    # 把若干 JCR 版本写入历史库，例如 python jif_history.py 影响因子历史.sqlite 期刊影响因子2022.xlsx 期刊影响因子2023.xlsx
+    if len(sys.argv) < 3:
+        print("用法: python jif_history.py 历史库路径 期刊影响因子.xlsx [...]")
+        return
+    for jif_path in sys.argv[2:]:
+        add_jif_edition(sys.argv[1], jif_path)
+
+
+if __name__ == "__main__":
+    main()
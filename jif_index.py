@@ -0,0 +1,198 @@
+import os
+import re
+import sys
+import sqlite3
+import pandas as pd
+from stage_cache import file_digest
+
+# 索引格式版本，索引表结构变化时递增，旧索引会被自动重建
+INDEX_VERSION = 2
+
+# 默认的索引目录，所有委托人共用，不写入委托人的输入文件夹
+JIF_INDEX_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'jif_index')
+
+# 单条 SQL 语句中使用的最大参数个数
+LOOKUP_CHUNK_SIZE = 500
+
+# 有效的 ISSN（去掉连字符后）：7 位数字加 1 位校验位（数字或 X）
+ISSN_PATTERN = r'^(\d{7})([\dX])$'
+
+# 影响因子列名，例如 '2023 JIF'，年份即 JCR 版本年份
+JIF_COLUMN_PATTERN = r'^(\d{4}) JIF$'
+
+# 期刊匹配顺序：(匹配键列, 匹配方式)，前一级未匹配的期刊才进入下一级
+MATCH_KEYS = [('ISSN键', 'ISSN'), ('eISSN键', 'eISSN'), ('标准化期刊名', '期刊名')]
+
+
+def normalize_journal_names(names):
+    """
+    标准化期刊名：去掉 '& ' 和 '-'，并转换为小写，空值为 ''
+    """
+    return names.fillna('').astype(str).str.replace('& ', '', regex=False).str.replace('-', '', regex=False).str.lower()
+
+
+def encode_issns(issns):
+    """
+    把 ISSN 编码为整数键：前 7 位数字 × 11 + 校验位（X 记为 10），格式无效或为空时为 <NA>。
+    """
+    parts = issns.astype('string').str.upper().str.replace(r'[\s-]', '', regex=True).str.extract(ISSN_PATTERN)
+    return (pd.to_numeric(parts[0]) * 11 + pd.to_numeric(parts[1].replace('X', '10'))).astype('Int64')
+
+
+def add_journal_keys(df, name_column):
+    """
+    为表格添加期刊匹配键：标准化期刊名、ISSN键、eISSN键；缺少 ISSN 或 eISSN 列时对应的键为空。
+    """
+    df['标准化期刊名'] = normalize_journal_names(df[name_column])
+    for column in ['ISSN', 'eISSN']:
+        issns = df[column] if column in df.columns else pd.Series(pd.NA, index=df.index, dtype='string')
+        df[column + '键'] = encode_issns(issns)
+    return df
+
+
+def jif_column(columns):
+    """
+    找出期刊影响因子表中的影响因子列，返回 (列名, JCR 版本年份)，例如 ('2023 JIF', 2023)。
+    """
+    for column in columns:
+        match = re.match(JIF_COLUMN_PATTERN, str(column))
+        if match:
+            return column, int(match.group(1))
+    raise ValueError("期刊影响因子表中没有 'YYYY JIF' 形式的影响因子列")
+
+
+def default_index_path(jif_path, index_dir=None):
+    """
+    默认把索引保存在共享的索引目录 index_dir（未指定时为 JIF_INDEX_DIR）中，按期刊影响因子表的内容哈希命名，
+    例如 3f2a9c0d1e4b5a67.jif_index.sqlite；各委托人文件夹中内容相同的表共用同一个索引。
+    """
+    index_dir = index_dir or JIF_INDEX_DIR
+    os.makedirs(index_dir, exist_ok=True)
+    return os.path.join(index_dir, f'{file_digest(jif_path)[:16]}.jif_index.sqlite')
+
+
+def read_index_meta(index_path):
+    """
+    读取索引的元数据（版本和源文件哈希），索引不存在或已损坏时返回空字典。
+    """
+    if not os.path.exists(index_path):
+        return {}
+    try:
+        with sqlite3.connect(f'file:{index_path}?mode=ro', uri=True) as conn:
+            return dict(conn.execute('SELECT key, value FROM meta').fetchall())
+    except sqlite3.Error:
+        return {}
+
+
+def is_index_current(index_path, jif_path):
+    meta = read_index_meta(index_path)
+    return meta.get('version') == str(INDEX_VERSION) and meta.get('source_digest') == file_digest(jif_path)
+
+
+def build_jif_index(jif_path, index_path=None):
+    """
+    一次性把期刊影响因子表编译为 SQLite 索引：保留原表全部列，另加标准化期刊名、ISSN键、eISSN键，
+    并在这三个匹配键上建立索引。先写临时文件再替换，多个进程同时构建时互不影响。
+    """
+    index_path = index_path or default_index_path(jif_path)
+    jif_df = add_journal_keys(pd.read_excel(jif_path), 'Journal name')
+
+    temp_path = f'{index_path}.{os.getpid()}.tmp'
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+    with sqlite3.connect(temp_path) as conn:
+        jif_df.to_sql('jif', conn, index=False)
+        for column, _ in MATCH_KEYS:
+            conn.execute(f'CREATE INDEX "idx_{column}" ON jif ("{column}")')
+        conn.execute('CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)')
+        conn.executemany('INSERT INTO meta VALUES (?, ?)',
+                         [('version', str(INDEX_VERSION)), ('source_digest', file_digest(jif_path))])
+    conn.close()
+    os.replace(temp_path, index_path)
+
+    print(f"期刊影响因子索引已保存到 {index_path}（{len(jif_df)} 行）")
+    return index_path
+
+
+def ensure_jif_index(jif_path, index_path=None):
+    """
+    返回可用的索引路径：索引不存在、版本不同或期刊影响因子表内容有变化时重新构建。
+    """
+    index_path = index_path or default_index_path(jif_path)
+    if not is_index_current(index_path, jif_path):
+        build_jif_index(jif_path, index_path)
+    return index_path
+
+
+def lookup_journals(index_path, column, keys, table='jif'):
+    """
+    从索引的 table 表中取出 column 列的值属于 keys 的全部行（列名与期刊影响因子表相同，另含三个匹配键），空键被忽略。
+    """
+    keys = sorted({key.item() if hasattr(key, 'item') else key for key in keys if not pd.isna(key)})
+    with sqlite3.connect(f'file:{index_path}?mode=ro', uri=True) as conn:
+        frames = []
+        for start in range(0, len(keys), LOOKUP_CHUNK_SIZE):
+            chunk = keys[start:start + LOOKUP_CHUNK_SIZE]
+            placeholders = ', '.join('?' * len(chunk))
+            frames.append(pd.read_sql_query(f'SELECT * FROM "{table}" WHERE "{column}" IN ({placeholders})',
+                                             conn, params=chunk))
+        if not frames:
+            frames.append(pd.read_sql_query(f'SELECT * FROM "{table}" LIMIT 0', conn))
+    conn.close()
+    return pd.concat(frames, ignore_index=True)
+
+
+def match_journals(journals, index_path, table='jif'):
+    """
+    按 ISSN、eISSN、标准化期刊名的顺序逐级做哈希连接，为每个期刊找到期刊影响因子表（索引的 table 表）中的期刊。
+    journals 需含三个匹配键列，返回时增加 匹配期刊名（影响因子表中的标准化期刊名）、匹配方式
+    和 影响因子表期刊名 三列，未匹配的期刊这三列为空。
+    """
+    journals = journals.copy()
+    journals['匹配期刊名'] = None
+    journals['匹配方式'] = None
+    journals['影响因子表期刊名'] = None
+
+    for key_column, method in MATCH_KEYS:
+        unmatched = journals['匹配期刊名'].isna() & journals[key_column].notna()
+        if not unmatched.any():
+            continue
+
+        candidates = lookup_journals(index_path, key_column, journals.loc[unmatched, key_column], table=table)
+        candidates = candidates.drop_duplicates(key_column)
+        lookup = pd.DataFrame({
+            key_column: candidates[key_column].astype(journals[key_column].dtype),
+            '候选期刊名': candidates['标准化期刊名'],
+            '候选原名': candidates['Journal name'],
+        })
+        matched = journals.loc[unmatched, [key_column]].merge(lookup, on=key_column, how='left')
+        matched.index = journals.index[unmatched]
+        matched = matched[matched['候选期刊名'].notna()]
+
+        journals.loc[matched.index, '匹配期刊名'] = matched['候选期刊名']
+        journals.loc[matched.index, '匹配方式'] = method
+        journals.loc[matched.index, '影响因子表期刊名'] = matched['候选原名']
+
+    return journals
+
+
+def match_summary(journals):
+    """
+    统计各匹配方式匹配到的期刊数，例如 'ISSN 40，eISSN 2，期刊名 1，未匹配 3'。
+    """
+    counts = journals['匹配方式'].fillna('未匹配').value_counts()
+    methods = [method for _, method in MATCH_KEYS]
+    methods += [method for method in counts.index if method not in methods and method != '未匹配'] + ['未匹配']
+    return '，'.join(f"{method} {counts.get(method, 0)}" for method in methods)
+
+
+def main():
+    # 一次性构建索引，例如 python jif_index.py 期刊影响因子.xlsx [索引路径]
+    if len(sys.argv) < 2:
+        print("用法: python jif_index.py 期刊影响因子.xlsx [索引路径]")
+        return
+    build_jif_index(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+import pandas as pd
+from xlsxwriter.utility import xl_col_to_name
+from jif_index import add_journal_keys, ensure_jif_index, jif_column, lookup_journals, match_journals, match_summary
+from jif_history import read_editions, nearest_editions, lookup_history
+from journal_resolver import resolve_journals
+
+# JIF Quartile 从高到低，有序分类中最小的值即最高分区
+QUARTILE_ORDER = ['Q1', 'Q2', 'Q3', 'Q4']
+
+
+def count_and_match_journals(scie_df, index_path):
+    """
+    统计每个期刊（按标准化期刊名）的论文数，保留第一次出现的 Source Title 作为显示名，
+    并在期刊影响因子索引中依次按 ISSN、eISSN、标准化期刊名匹配期刊；
+    仍未匹配的期刊用期刊全称和缩写的三元组索引做模糊匹配，匹配方式记为“模糊匹配”；
+    系列号不同或与次佳候选差距不足的候选已由 resolve_journals 排除，通过的匹配直接带入影响因子和分区，
+    同时保留 匹配文本、匹配来源、相似度 三列，在 模糊匹配审核 工作表中逐一列出供人工核对。
+    """
+    journal_counts = scie_df['标准化期刊名'].value_counts().reset_index()
+    journal_counts.columns = ['标准化期刊名', '论文数']
+    journal_counts = pd.merge(journal_counts, scie_df.drop_duplicates('标准化期刊名')[
+        ['标准化期刊名', 'Source Title', 'ISSN键', 'eISSN键']], on='标准化期刊名', how='left')
+
+    journal_counts = match_journals(journal_counts, index_path)
+
+    unmatched = journal_counts['匹配期刊名'].isna()
+    resolved = resolve_journals(index_path, journal_counts.loc[unmatched, 'Source Title'])
+    journal_counts = journal_counts.join(resolved[['匹配文本', '匹配来源', '相似度']])
+    journal_counts.loc[resolved.index, ['匹配期刊名', '影响因子表期刊名']] = resolved[['匹配期刊名', '影响因子表期刊名']]
+    journal_counts.loc[resolved.index, '匹配方式'] = '模糊匹配'
+
+    print(f"期刊匹配：{match_summary(journal_counts)}")
+    return journal_counts
+
+
+def join_jif_records(journal_counts, index_path):
+    """
+    只取出匹配到的期刊在期刊影响因子表中的全部记录（每个学科类别一行），与期刊统计合并。
+    """
+    jif_df = lookup_journals(index_path, '标准化期刊名', journal_counts['匹配期刊名'])
+    jif_df = jif_df.drop(columns=['ISSN键', 'eISSN键']).rename(columns={'标准化期刊名': '匹配期刊名'})
+    return pd.merge(journal_counts, jif_df, on='匹配期刊名', how='left')
+
+
+def group_concat(keys, values, unique=False):
+    """
+    按 keys 分组，用换行符连接每组的非空 values（保持原有顺序），unique=True 时去掉组内重复值。
+    keys 须已排好序；结果按 keys 的顺序排列，没有值的组为 ''。
+    """
+    frame = pd.DataFrame({'key': keys, 'value': values}).dropna()
+    if unique:
+        frame = frame.drop_duplicates()
+    joined = (frame['value'].astype(str) + '\n').groupby(frame['key'], sort=False).sum().str[:-1]
+    return joined.reindex(pd.unique(keys), fill_value='')
+
+
+def highest_quartiles(quartiles, keys):
+    """
+    按 keys 分组取最高分区：Q1~Q4 作为有序分类，最高分区即组内最小值；没有分区的组为 None。
+    """
+    quartiles = pd.Categorical(quartiles, categories=QUARTILE_ORDER, ordered=True)
+    highest = pd.Series(quartiles, index=keys.index).groupby(keys, sort=False).min()
+    return highest.astype(object).where(highest.notna(), None)
+
+
+def aggregate_journals(merged_df, jif_year, multiple_categories=False):
+    """
+    把每个期刊的多条影响因子记录汇总为一行：论文数、Source Title、最高影响因子，以及最高分区；
+    multiple_categories=True 时改为列出全部学科类别（去重）和全部分区，均用换行符连接。
+    只对标准化期刊名做一次稳定排序，之后的分组汇总都不再调用 Python 函数。
+    """
+    merged_df = merged_df.sort_values('标准化期刊名', kind='stable')
+    keys = merged_df['标准化期刊名']
+    groups = merged_df.groupby(keys, sort=False)
+
+    grouped = pd.DataFrame({
+        'Source Title': groups['Source Title'].first(),
+        '论文数': groups['论文数'].first(),
+        f'影响因子{jif_year}年': pd.to_numeric(merged_df[f'{jif_year} JIF'], errors='coerce').groupby(
+            keys, sort=False).max(),
+    })
+
+    if multiple_categories:
+        grouped['学科类别'] = group_concat(keys, merged_df['Category'], unique=True)
+        grouped['分区'] = group_concat(keys, merged_df['JIF Quartile'])
+    else:
+        grouped['分区'] = highest_quartiles(merged_df['JIF Quartile'], keys)
+
+    return grouped.rename_axis('标准化期刊名').reset_index()
+
+
+def category_statistics(merged_df, jif_year):
+    """
+    把匹配到的记录展开为期刊 × 学科类别（每对一行），一次分组汇总每个学科类别的期刊数、论文数、
+    Q1~Q4 各分区的论文数和按论文数加权的平均影响因子，按论文数降序排列。
+    """
+    pairs = merged_df.dropna(subset=['Category']).drop_duplicates(['标准化期刊名', 'Category'])
+    papers = pairs['论文数']
+    jif = pd.to_numeric(pairs[f'{jif_year} JIF'], errors='coerce')
+
+    frame = pd.DataFrame({
+        '学科类别': pairs['Category'],
+        '期刊数': 1,
+        '论文数': papers,
+        **{quartile: papers.where(pairs['JIF Quartile'] == quartile, 0) for quartile in QUARTILE_ORDER},
+        '加权影响因子': (jif * papers).fillna(0),
+        '有影响因子论文数': papers.where(jif.notna(), 0),
+    })
+    stats = frame.groupby('学科类别').sum()
+    stats['平均影响因子'] = (stats.pop('加权影响因子') / stats.pop('有影响因子论文数')).round(3)
+    return stats.reset_index().sort_values(['论文数', '学科类别'], ascending=[False, True])
+
+
+def summarize_editions(history_df):
+    """
+    把历史库中每个期刊（按 期刊 列）在每个 JCR 版本的多条记录（每个学科类别一行）汇总为最高影响因子和最高分区。
+    """
+    keys = history_df['期刊'] + '\t' + history_df['JCR年份'].astype(str)
+    groups = history_df.groupby(keys, sort=False)
+    summary = pd.DataFrame({
+        '期刊': groups['期刊'].first(),
+        'JCR年份': groups['JCR年份'].first(),
+        '影响因子': pd.to_numeric(history_df['JIF'], errors='coerce').groupby(keys, sort=False).max(),
+        '分区': highest_quartiles(history_df['JIF Quartile'], keys),
+    })
+    return summary.reset_index(drop=True)
+
+
+def history_journals(journal_counts):
+    """
+    每个期刊在历史库中的匹配键：期刊 为 SCI-E 的标准化期刊名，ISSN键、eISSN键 取自 SCI-E，
+    标准化期刊名 为当前版本中匹配到的期刊名（未匹配时用 SCI-E 的标准化期刊名）。
+    """
+    return pd.DataFrame({
+        '期刊': journal_counts['标准化期刊名'],
+        'ISSN键': journal_counts['ISSN键'],
+        'eISSN键': journal_counts['eISSN键'],
+        '标准化期刊名': journal_counts['匹配期刊名'].fillna(journal_counts['标准化期刊名']),
+    })
+
+
+def add_trend_columns(grouped, journal_counts, history_path, years):
+    """
+    从历史库中只查询所需年份和期刊，为每个期刊添加各年份的影响因子列（影响因子YYYY年）；
+    各版本按 ISSN、eISSN、期刊名的顺序匹配，期刊改名前的年份也有影响因子。
+    """
+    journals = history_journals(journal_counts)
+    journals = journals[journals['期刊'].isin(grouped['标准化期刊名'])]
+    requests = pd.concat([journals.assign(JCR年份=year) for year in years], ignore_index=True)
+    summary = summarize_editions(lookup_history(history_path, requests))
+    trend = summary.pivot(index='期刊', columns='JCR年份', values='影响因子')
+    for year in years:
+        grouped[f'影响因子{year}年'] = grouped['标准化期刊名'].map(trend[year]) if year in trend.columns else None
+    return grouped
+
+
+def paper_jif_table(scie_df, journal_counts, history_path, editions):
+    """
+    为每篇论文查出其出版年份对应（最接近）的 JCR 版本中的影响因子和最高分区。
+    """
+    papers = scie_df[[column for column in ['Article Title', 'Source Title', 'Publication Year']
+                      if column in scie_df.columns]].copy()
+    papers['期刊'] = scie_df['标准化期刊名']
+    publication_years = scie_df['Publication Year'] if 'Publication Year' in scie_df.columns \
+        else pd.Series(None, index=scie_df.index, dtype=float)
+    papers['JCR年份'] = nearest_editions(publication_years, editions)
+
+    requests = papers[['JCR年份', '期刊']].dropna().drop_duplicates().merge(history_journals(journal_counts), on='期刊')
+    summary = summarize_editions(lookup_history(history_path, requests))
+    papers = pd.merge(papers, summary, on=['期刊', 'JCR年份'], how='left')
+    return papers.drop(columns='期刊')
+
+
+def report_columns(jif_year, multiple_categories=False, trend_years=()):
+    columns = ['序号', 'Source Title', '论文数', f'影响因子{jif_year}年'] + \
+              [f'影响因子{year}年' for year in trend_years] + ['分区']
+    if multiple_categories:
+        columns.insert(-1, '学科类别')
+    return columns
+
+
+def write_journal_report(grouped, output_path, columns, extra_sheets=None):
+    """
+    使用 xlsxwriter 导出期刊统计表，字体为 Times New Roman：A 列左对齐，C 列起居中；
+    extra_sheets（{工作表名: DataFrame}）中的表格依次另写为工作表。
+    """
+    last_column = xl_col_to_name(len(columns) - 1)
+
+    with pd.ExcelWriter(output_path, engine='xlsxwriter') as writer:
+        grouped[columns].to_excel(writer, index=False, sheet_name='Sheet1')
+
+        workbook = writer.book
+        worksheet = writer.sheets['Sheet1']
+
+        # 设置字体为 Times New Roman
+        cell_format = workbook.add_format({'font_name': 'Times New Roman'})
+        worksheet.set_column(f'A:{last_column}', None, cell_format)
+
+        # 设置 C 列及之后的列居中对齐
+        center_format = workbook.add_format({'align': 'center', 'font_name': 'Times New Roman'})
+        worksheet.set_column(f'C:{last_column}', None, center_format)
+
+        # 设置 A 列左对齐
+        left_align_format = workbook.add_format({'align': 'left', 'font_name': 'Times New Roman'})
+        worksheet.set_column('A:A', None, left_align_format)
+
+        for sheet_name, sheet_df in (extra_sheets or {}).items():
+            sheet_df.to_excel(writer, index=False, sheet_name=sheet_name)
+            writer.sheets[sheet_name].set_column(0, len(sheet_df.columns) - 1, 40, cell_format)
+
+    print(f"结果已保存到 {output_path}")
+
+
+def process_journal_data(scie_path, jif_path, output_path, multiple_categories=False, index_path=None,
+                         history_path=None, trend_years=None, category_report=False):
+    """
+    期刊统计及影响因子与分区表：统计每个期刊的论文数，匹配影响因子和分区后按影响因子降序导出。
+    count_journals_and_JIF_for_word 和 count_journals_and_JIF_multiple_categories_for_word 共用此流程。
+    传入影响因子历史库 history_path 时，添加 trend_years 各年份的影响因子列（默认为历史库中除当前版本外的全部年份），
+    并写出 论文影响因子 工作表，列出每篇论文出版年份对应 JCR 版本的影响因子和分区。
+    category_report=True 时另写 学科类别统计 工作表。
+    """
+    # 读取 SCI-E收录.xlsx 数据，标准化 Source Title 列，并把 ISSN、eISSN 编码为整数匹配键
+    scie_df = add_journal_keys(pd.read_excel(scie_path), 'Source Title')
+
+    # 在预编译的期刊影响因子索引中匹配期刊（索引不存在或已过期时自动构建）
+    index_path = ensure_jif_index(jif_path, index_path)
+    journal_counts = count_and_match_journals(scie_df, index_path)
+    merged_df = join_jif_records(journal_counts, index_path)
+    _, jif_year = jif_column(merged_df.columns)
+    grouped = aggregate_journals(merged_df, jif_year, multiple_categories)
+
+    match_df = journal_counts[['Source Title', '匹配方式', '影响因子表期刊名']].fillna({'匹配方式': '未匹配'})
+    extra_sheets = {'期刊匹配': match_df}
+
+    # 模糊匹配审核：列出每个模糊匹配到的期刊及其匹配文本、来源和相似度，供人工核对已带入的影响因子
+    extra_sheets['模糊匹配审核'] = journal_counts.loc[journal_counts['匹配方式'] == '模糊匹配', [
+        'Source Title', '影响因子表期刊名', '匹配文本', '匹配来源', '相似度']]
+    if category_report:
+        extra_sheets['学科类别统计'] = category_statistics(merged_df, jif_year)
+
+    # 影响因子历史库：各年份影响因子列和按出版年份匹配的论文影响因子
+    editions = sorted(read_editions(history_path)) if history_path else []
+    trend_years = [year for year in (editions if trend_years is None else trend_years)
+                   if year != jif_year] if editions else []
+    if trend_years:
+        grouped = add_trend_columns(grouped, journal_counts, history_path, trend_years)
+    if editions:
+        extra_sheets['论文影响因子'] = paper_jif_table(scie_df, journal_counts, history_path, editions)
+
+    # 按照当前版本影响因子降序排列
+    grouped.sort_values(by=f'影响因子{jif_year}年', ascending=False, inplace=True)
+
+    # 添加序号列
+    grouped.insert(0, '序号', range(1, len(grouped) + 1))
+
+    # 添加合计行
+    columns = report_columns(jif_year, multiple_categories, trend_years)
+    total_row = {column: ['/'] for column in columns}
+    total_row.update({'序号': ['合计'], '论文数': [grouped['论文数'].sum()]})
+    grouped = pd.concat([grouped, pd.DataFrame(total_row)], ignore_index=True)
+
+    write_journal_report(grouped, output_path, columns, extra_sheets)
+    return grouped
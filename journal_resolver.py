@@ -0,0 +1,111 @@
+import re
+import sqlite3
+import pandas as pd
+from trigram_index import build_trigram_index, query_trigram_candidates
+
+# 期刊名模糊匹配的最低 Dice 相似度
+FUZZY_JOURNAL_THRESHOLD = 0.8
+
+# 最佳候选须比另一个期刊的次佳候选高出的相似度，差距不足时视为无法确定
+FUZZY_JOURNAL_MARGIN = 0.05
+
+# 系列号：单个字母、罗马数字或阿拉伯数字，如 Journal of Materials Chemistry A/B/C、Part A/B、I/II
+SERIES_TOKEN_PATTERN = r'^(?:[a-z]|[ivx]+|\d+)$'
+
+# 参与模糊匹配的期刊影响因子表列及其名称：期刊全称、JCR 缩写和 ISO 缩写（缺少的列自动跳过）
+NAME_COLUMNS = [('Journal name', '全称'), ('JCR Abbreviation', 'JCR缩写'), ('ISO Abbreviation', 'ISO缩写')]
+
+
+def fuzzy_journal_key(name):
+    """
+    模糊匹配用的期刊名：小写，'&' 改为 'and'，去掉标点和开头的 'the'，合并多余空格。
+    """
+    if pd.isna(name):
+        return ''
+    name = str(name).lower().replace('&', ' and ')
+    name = re.sub(r'[^\w\s]', ' ', name)
+    name = re.sub(r'^\s*the\s+', '', name)
+    return ' '.join(name.split())
+
+
+def series_tokens(text):
+    """
+    依次取出模糊匹配用期刊名中的系列号，例如 'journal of materials chemistry b' -> ['b']。
+    """
+    return [token for token in text.split() if re.match(SERIES_TOKEN_PATTERN, token)]
+
+
+def build_journal_resolver(index_path):
+    """
+    从期刊影响因子索引中读出全部期刊的全称和缩写，建立三元组索引。
+    返回 {'index': 三元组索引, 'texts': [...], 'sources': [...], 'names': [标准化期刊名], 'titles': [Journal name]}。
+    """
+    with sqlite3.connect(f'file:{index_path}?mode=ro', uri=True) as conn:
+        table_columns = {row[1] for row in conn.execute('PRAGMA table_info(jif)')}
+        columns = [(column, source) for column, source in NAME_COLUMNS if column in table_columns]
+        select = ', '.join(f'"{column}"' for column in ['标准化期刊名'] + [column for column, _ in columns])
+        journals_df = pd.read_sql_query(f'SELECT DISTINCT {select} FROM jif', conn)
+    conn.close()
+
+    resolver = {'texts': [], 'sources': [], 'names': [], 'titles': []}
+    seen = set()
+    for row in journals_df.itertuples(index=False):
+        row = dict(zip(journals_df.columns, row))
+        for column, source in columns:
+            text = fuzzy_journal_key(row[column])
+            if not text or (text, row['标准化期刊名']) in seen:
+                continue
+            seen.add((text, row['标准化期刊名']))
+            resolver['texts'].append(text)
+            resolver['sources'].append(source)
+            resolver['names'].append(row['标准化期刊名'])
+            resolver['titles'].append(row['Journal name'])
+
+    resolver['index'] = build_trigram_index(resolver['texts'])
+    return resolver
+
+
+def resolve_journal(resolver, title, threshold=FUZZY_JOURNAL_THRESHOLD, margin=FUZZY_JOURNAL_MARGIN):
+    """
+    在三元组索引中查找与 title 最相似的期刊全称或缩写，返回匹配信息字典。
+    系列号与 title 不同的候选（如 Chemistry A 与 Chemistry B）直接排除；最佳候选的相似度低于阈值，
+    或与另一个期刊的次佳候选相差不足 margin 时返回 None。
+    """
+    key = fuzzy_journal_key(title)
+    query_series = series_tokens(key)
+    candidates = [(position, score) for position, score in
+                  query_trigram_candidates(resolver['index'], key, max(threshold - margin, 0.0))
+                  if series_tokens(resolver['texts'][position]) == query_series]
+    if not candidates or candidates[0][1] < threshold:
+        return None
+
+    position, score = candidates[0]
+    runner_up = next((other_score for other, other_score in candidates[1:]
+                      if resolver['names'][other] != resolver['names'][position]), 0.0)
+    if score - runner_up < margin:
+        return None
+    return {
+        '匹配期刊名': resolver['names'][position],
+        '影响因子表期刊名': resolver['titles'][position],
+        '匹配文本': resolver['texts'][position],
+        '匹配来源': resolver['sources'][position],
+        '相似度': round(score, 3),
+    }
+
+
+def resolve_journals(index_path, titles, threshold=FUZZY_JOURNAL_THRESHOLD, margin=FUZZY_JOURNAL_MARGIN):
+    """
+    为一组期刊名逐个做模糊匹配，返回匹配成功的结果（索引与 titles 相同）；只在有待匹配期刊时建立索引。
+    """
+    columns = ['匹配期刊名', '影响因子表期刊名', '匹配文本', '匹配来源', '相似度']
+    titles = titles.dropna()
+    if titles.empty:
+        return pd.DataFrame(columns=columns)
+
+    resolver = build_journal_resolver(index_path)
+    resolved = {}
+    for position, title in titles.items():
+        hit = resolve_journal(resolver, title, threshold, margin)
+        if hit is not None:
+            resolved[position] = hit
+    return pd.DataFrame(list(resolved.values()), index=list(resolved.keys()), columns=columns)
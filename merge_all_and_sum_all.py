@@ -3,11 +3,21 @@ from openpyxl import load_workbook, Workbook
 from copy import copy
 import sys
 
+
+def list_merge_files(folder_path, prefix, output_filename):
+    """
+    列出以指定前缀开头的 .xlsx 文件（按文件名排序），不包括合并结果文件本身，重复运行时不会把上次的汇总表再合并进来。
+    """
+    return sorted(
+        [os.path.join(folder_path, f) for f in os.listdir(folder_path)
+         if f.startswith(prefix) and f.endswith('.xlsx') and f != output_filename])
+
+
 #汇总引用明细表，3_开头的文件
-def merge_excel_files_with_format(folder_path, prefix, output_filename):
-    # Get a list of files starting with the given prefix and sort them in ascending order
-    file_list = sorted(
-        [os.path.join(folder_path, f) for f in os.listdir(folder_path) if f.startswith(prefix) and f.endswith('.xlsx')])
+def merge_excel_files_with_format(folder_path, prefix, output_filename, file_list=None):
+    # Without an explicit file_list, merge every file in the folder that starts with the given prefix
+    if file_list is None:
+        file_list = list_merge_files(folder_path, prefix, output_filename)
 
     # If no files are found, print a message and exit the program
     if not file_list:
@@ -81,10 +91,10 @@ if __name__ == "__main__":
 
 
 #汇总引用统计表，4_开头的文件
-def merge_excel_files_with_continuous_citation_numbers(folder_path, prefix, output_filename):
-    # Get a list of files starting with the given prefix and sort them in ascending order
-    file_list = sorted(
-        [os.path.join(folder_path, f) for f in os.listdir(folder_path) if f.startswith(prefix) and f.endswith('.xlsx')])
+def merge_excel_files_with_continuous_citation_numbers(folder_path, prefix, output_filename, file_list=None):
+    # Without an explicit file_list, merge every file in the folder that starts with the given prefix
+    if file_list is None:
+        file_list = list_merge_files(folder_path, prefix, output_filename)
 
     # If no files are found, print a message and exit the program
     if not file_list:
@@ -168,10 +178,10 @@ if __name__ == "__main__":
 
 
 #汇总引用格式for_word表，5_开头的文件
-def merge_excel_files_with_sequential_numbers(folder_path, prefix, output_filename):
-    # 获取以指定前缀开头的文件列表，并按文件名排序
-    file_list = sorted(
-        [os.path.join(folder_path, f) for f in os.listdir(folder_path) if f.startswith(prefix) and f.endswith('.xlsx')])
+def merge_excel_files_with_sequential_numbers(folder_path, prefix, output_filename, file_list=None):
+    # 未指定 file_list 时，获取以指定前缀开头的文件列表，并按文件名排序
+    if file_list is None:
+        file_list = list_merge_files(folder_path, prefix, output_filename)
 
     # 如果没有找到匹配的文件，输出提示信息并退出程序
     if not file_list:
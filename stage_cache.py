@@ -0,0 +1,113 @@
+import os
+import json
+import hashlib
+
+# 缓存清单文件名，保存在各输出目录中
+CACHE_FILE_NAME = '.stage_cache.json'
+
+
+def file_digest(path):
+    """
+    计算文件内容的 SHA-256，文件不存在时返回 None。
+    """
+    if not os.path.exists(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_cache(output_folder):
+    """
+    读取输出目录中的阶段缓存清单，不存在或已损坏时返回空缓存。
+    """
+    path = os.path.join(output_folder, CACHE_FILE_NAME)
+    stages = {}
+    if os.path.exists(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                stages = json.load(file)
+        except (OSError, ValueError):
+            stages = {}
+    return {'path': path, 'stages': stages}
+
+
+def save_cache(cache):
+    with open(cache['path'], 'w', encoding='utf-8') as file:
+        json.dump(cache['stages'], file, ensure_ascii=False, indent=1)
+
+
+def stage_key(inputs, params=None):
+    """
+    由各输入文件的内容哈希和参数生成阶段的缓存键。
+    """
+    digest = hashlib.sha256()
+    for path in sorted(inputs):
+        digest.update(os.path.basename(path).encode('utf-8'))
+        digest.update((file_digest(path) or 'missing').encode('utf-8'))
+    digest.update(json.dumps(params, ensure_ascii=False, sort_keys=True, default=str).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def is_stage_current(cache, stage_name, key, outputs):
+    """
+    缓存键相同且所有输出文件都存在、内容未被改动时，阶段结果仍然有效。
+    """
+    entry = cache['stages'].get(stage_name)
+    if entry is None or entry['key'] != key:
+        return False
+    return all(file_digest(path) == entry['outputs'].get(os.path.basename(path)) for path in outputs)
+
+
+def record_stage(cache, stage_name, key, outputs):
+    cache['stages'][stage_name] = {
+        'key': key,
+        'outputs': {os.path.basename(path): file_digest(path) for path in outputs},
+    }
+    save_cache(cache)
+
+
+def run_cached(cache, stage_name, inputs, outputs, func, params=None):
+    """
+    输入和参数未变化且输出仍有效时跳过阶段，否则运行 func 并记录新的缓存；cache 为 None 时总是运行。
+    返回 True 表示阶段被跳过。
+    """
+    if cache is None:
+        func()
+        return False
+
+    key = stage_key(inputs, params)
+    if is_stage_current(cache, stage_name, key, outputs):
+        print(f"跳过未变化的阶段: {stage_name}")
+        return True
+
+    func()
+    record_stage(cache, stage_name, key, outputs)
+    return False
+
+
+def run_cached_batch(cache, stages, run_stages):
+    """
+    批量版的 run_cached：stages 为 [(阶段名称, inputs, outputs, params), ...]，
+    找出需要重新运行的阶段，把它们的序号列表一次交给 run_stages（可以并行运行），完成后再统一记录缓存。
+    返回被跳过的阶段数。
+    """
+    if cache is None:
+        run_stages(list(range(len(stages))))
+        return 0
+
+    keys = [stage_key(inputs, params) for _, inputs, _, params in stages]
+    stale = []
+    for position, ((stage_name, _, outputs, _), key) in enumerate(zip(stages, keys)):
+        if is_stage_current(cache, stage_name, key, outputs):
+            print(f"跳过未变化的阶段: {stage_name}")
+        else:
+            stale.append(position)
+
+    run_stages(stale)
+    for position in stale:
+        stage_name, _, outputs, _ = stages[position]
+        record_stage(cache, stage_name, keys[position], outputs)
+    return len(stages) - len(stale)
@@ -0,0 +1,78 @@
+import math
+
+
+def text_trigrams(text):
+    """
+    将文本切分为字符三元组集合，首尾补空格以便短词和词首也能产生三元组。
+    """
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def build_trigram_index(texts):
+    """
+    为文本列表建立三元组倒排索引，返回
+    {'postings': {三元组: [文本位置, ...]}, 'grams': [每个文本的三元组集合], 'sizes': [每个文本的三元组数]}。
+    """
+    postings = {}
+    gram_sets = []
+
+    for position, text in enumerate(texts):
+        grams = text_trigrams(text)
+        gram_sets.append(grams)
+        for gram in grams:
+            postings.setdefault(gram, []).append(position)
+
+    return {'postings': postings, 'grams': gram_sets, 'sizes': [len(grams) for grams in gram_sets]}
+
+
+def query_trigram_candidates(index, text, threshold=0.0):
+    """
+    返回 Dice 相似度不低于 threshold 的全部候选 [(文本位置, 相似度), ...]，按相似度从高到低、位置从前到后排列。
+    前缀过滤：相似度达到阈值的文本至少与查询共享 ceil(t·|A| / (2 - t)) 个三元组，
+    因此只需从查询中最少见的 |A| - 该数 + 1 个三元组的倒排表取候选，"the"、" of" 这类常见三元组不会被遍历；
+    候选再按三元组数做长度过滤，最后用集合交集求出精确相似度。
+    """
+    if not text:
+        return []
+
+    grams = text_trigrams(text)
+    postings = index['postings']
+    sizes = index['sizes']
+
+    min_shared = max(math.ceil(threshold * len(grams) / (2 - threshold) - 1e-9), 1)
+    prefix = sorted(grams, key=lambda gram: len(postings.get(gram, ())))[:len(grams) - min_shared + 1]
+    min_size = threshold * len(grams) / (2 - threshold) - 1e-9
+    max_size = (2 - threshold) * len(grams) / threshold + 1e-9 if threshold > 0 else math.inf
+
+    candidates = set()
+    for gram in prefix:
+        candidates.update(postings.get(gram, ()))
+
+    hits = []
+    for position in candidates:
+        if not min_size <= sizes[position] <= max_size:
+            continue
+        score = 2 * len(grams & index['grams'][position]) / (len(grams) + sizes[position])
+        if score >= threshold:
+            hits.append((position, score))
+    return sorted(hits, key=lambda hit: (-hit[1], hit[0]))
+
+
+def trigram_similarity(text_a, text_b):
+    """
+    两段文本三元组集合的 Dice 相似度，任一文本为空时为 0。
+    """
+    if not text_a or not text_b:
+        return 0.0
+    grams_a, grams_b = text_trigrams(text_a), text_trigrams(text_b)
+    return 2 * len(grams_a & grams_b) / (len(grams_a) + len(grams_b))
+
+
+def query_trigram_index(index, text, threshold=0.0):
+    """
+    查找与 text 最相似的文本，返回 (文本位置, Dice 相似度)；没有候选或相似度低于阈值时返回 None。
+    相似度相同时取位置靠前的文本。
+    """
+    hits = query_trigram_candidates(index, text, threshold)
+    return hits[0] if hits else None